@@ -3,7 +3,7 @@ from django.contrib import admin
 # Register your models here.
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, TokenTransaction
+from .models import User, TokenTransaction, UsageRollup
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -37,4 +37,14 @@ class TokenTransactionAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     
     def has_add_permission(self, request):
-        return False  # Transactions are created automatically
\ No newline at end of file
+        return False  # Transactions are created automatically
+
+@admin.register(UsageRollup)
+class UsageRollupAdmin(admin.ModelAdmin):
+    """Usage Rollup Admin"""
+    list_display = ['user', 'service_type', 'day', 'tokens', 'count']
+    list_filter = ['service_type', 'day']
+    search_fields = ['user__username']
+    
+    def has_add_permission(self, request):
+        return False  # Rollups are maintained by the ledger
@@ -0,0 +1,130 @@
+"""
+Atomic token ledger.
+
+Every balance change is a single conditional UPDATE on ``token_balance``
+(``... SET token_balance = token_balance - n WHERE id = ? AND token_balance >= n``)
+plus the matching TokenTransaction insert, both inside one transaction. The
+database does the arithmetic, so concurrent requests from one user can never
+overdraw the balance or lose an update, and only the balance column is written
+instead of the whole user row.
+
+Each ledger row also bumps its UsageRollup bucket in the same transaction, so
+the dashboard totals always agree with the ledger.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import User, TokenTransaction, UsageRollup
+
+
+def _balance(user_id):
+    return User.objects.filter(pk=user_id).values_list('token_balance', flat=True).get()
+
+
+def _record_usage(entry):
+    """Add a ledger row to its (user, service, day) rollup bucket."""
+    key = {
+        'user_id': entry.user_id,
+        'service_type': entry.service_type,
+        'day': timezone.localdate(entry.created_at),
+    }
+    if entry.amount < 0:
+        values = {'tokens': -entry.amount, 'count': 1, 'credited': 0}
+    else:
+        values = {'tokens': 0, 'count': 0, 'credited': entry.amount}
+    increments = {field: F(field) + value for field, value in values.items()}
+
+    if UsageRollup.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            UsageRollup.objects.create(**key, **values)
+    except IntegrityError:
+        # Another request created the bucket first
+        UsageRollup.objects.filter(**key).update(**increments)
+
+
+def debit(user, amount, service_type):
+    """Take ``amount`` tokens from ``user``.
+
+    Returns the new balance, or None if the balance was too low. The passed
+    in user object is updated so the rest of the request sees the new balance.
+    """
+    with transaction.atomic():
+        updated = User.objects.filter(pk=user.pk, token_balance__gte=amount).update(
+            token_balance=F('token_balance') - amount
+        )
+        if not updated:
+            return None
+        balance = _balance(user.pk)
+        entry = TokenTransaction.objects.create(
+            user_id=user.pk,
+            amount=-amount,
+            service_type=service_type,
+            balance_after=balance
+        )
+        _record_usage(entry)
+    user.token_balance = balance
+    return balance
+
+
+def credit(user, amount, service_type='purchase'):
+    """Give ``amount`` tokens to ``user`` and return the new balance."""
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(token_balance=F('token_balance') + amount)
+        balance = _balance(user.pk)
+        entry = TokenTransaction.objects.create(
+            user_id=user.pk,
+            amount=amount,
+            service_type=service_type,
+            balance_after=balance
+        )
+        _record_usage(entry)
+    user.token_balance = balance
+    return balance
+
+
+def bulk_debit(charges):
+    """Apply many debits in one transaction.
+
+    ``charges`` is an iterable of ``(user_id, amount, service_type)``. Charges
+    are summed per user, so each user gets one conditional UPDATE and one
+    ledger row per service type no matter how many charges they had. A user
+    whose balance cannot cover their total is skipped entirely.
+
+    Returns ``{user_id: new_balance or None}``.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    for user_id, amount, service_type in charges:
+        totals[user_id][service_type] += amount
+
+    results = {}
+    with transaction.atomic():
+        for user_id, by_service in totals.items():
+            total = sum(by_service.values())
+            updated = User.objects.filter(pk=user_id, token_balance__gte=total).update(
+                token_balance=F('token_balance') - total
+            )
+            if not updated:
+                results[user_id] = None
+                continue
+            balance = _balance(user_id)
+            results[user_id] = balance
+
+            # Ledger rows carry the running balance, oldest first
+            running = balance + total
+            rows = []
+            for service_type, amount in by_service.items():
+                running -= amount
+                rows.append(TokenTransaction(
+                    user_id=user_id,
+                    amount=-amount,
+                    service_type=service_type,
+                    balance_after=running
+                ))
+            for entry in TokenTransaction.objects.bulk_create(rows):
+                _record_usage(entry)
+    return results
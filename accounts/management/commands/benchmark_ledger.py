@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts import ledger
+from accounts.models import User, TokenTransaction
+
+
+def legacy_debit(user, amount, service_type):
+    """The old read-modify-write deduct_tokens, kept for comparison."""
+    if user.token_balance >= amount:
+        user.token_balance -= amount
+        user.save()
+        TokenTransaction.objects.create(
+            user=user,
+            amount=-amount,
+            service_type=service_type,
+            balance_after=user.token_balance
+        )
+        return True
+    return False
+
+
+class Command(BaseCommand):
+    help = 'Hammer one account with concurrent debits and check for lost updates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--ops', type=int, default=50, help='Debits per thread')
+        parser.add_argument('--amount', type=int, default=1)
+        parser.add_argument('--overdraw', action='store_true',
+                            help='Start with only half the tokens needed, to test the balance floor')
+        parser.add_argument('--legacy', action='store_true',
+                            help='Also run the old read-modify-write implementation')
+
+    def handle(self, *args, **options):
+        results = [self.run('ledger', self.ledger_debit, options)]
+        if options['legacy']:
+            results.append(self.run('legacy', legacy_debit, options))
+        self.stdout.write(json.dumps(results, indent=2))
+
+    @staticmethod
+    def ledger_debit(user, amount, service_type):
+        return ledger.debit(user, amount, service_type) is not None
+
+    def run(self, name, debit, options):
+        threads, ops, amount = options['threads'], options['ops'], options['amount']
+        wanted = threads * ops * amount
+        initial = wanted // 2 if options['overdraw'] else wanted
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create(
+            username=f'ledger-bench-{tag}',
+            email=f'ledger-bench-{tag}@example.com',
+            token_balance=initial
+        )
+
+        successes = []
+        errors = []
+        start = threading.Barrier(threads)
+
+        def worker():
+            # Each thread acts like a separate request with its own cached user
+            me = User.objects.get(pk=user.pk)
+            ok = 0
+            start.wait()
+            for _ in range(ops):
+                try:
+                    if debit(me, amount, 'codehelper'):
+                        ok += 1
+                except Exception as e:
+                    errors.append(str(e))
+                if name == 'legacy':
+                    me.refresh_from_db()
+            successes.append(ok)
+            connection.close()
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        user.refresh_from_db()
+        debited = sum(successes) * amount
+        ledger_rows = TokenTransaction.objects.filter(user=user).count()
+        result = {
+            'implementation': name,
+            'threads': threads,
+            'attempted': threads * ops,
+            'succeeded': sum(successes),
+            'errors': len(errors),
+            'seconds': round(elapsed, 3),
+            'ops_per_second': round(threads * ops / elapsed, 1),
+            'initial_balance': initial,
+            'final_balance': user.token_balance,
+            'expected_balance': initial - debited,
+            'lost_updates': (user.token_balance - (initial - debited)) // amount,
+            'ledger_rows': ledger_rows,
+            'negative_balance': user.token_balance < 0,
+        }
+        with transaction.atomic():
+            user.delete()
+        return result
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+from django.db.models.functions import TruncDate
+
+from accounts.models import TokenTransaction, UsageRollup
+
+
+def ledger_buckets(users=None):
+    """Aggregate the raw ledger into rollup buckets: {(user, service, day): values}."""
+    ledger = TokenTransaction.objects.all()
+    if users:
+        ledger = ledger.filter(user_id__in=users)
+    rows = ledger.annotate(day=TruncDate('created_at')).values(
+        'user_id', 'service_type', 'day'
+    ).annotate(
+        tokens=Sum(Case(When(amount__lt=0, then=-F('amount')), default=0, output_field=IntegerField())),
+        count=Count('id', filter=Q(amount__lt=0)),
+        credited=Sum(Case(When(amount__gt=0, then=F('amount')), default=0, output_field=IntegerField())),
+    ).order_by()
+    return {
+        (row['user_id'], row['service_type'], row['day']): (row['tokens'], row['count'], row['credited'])
+        for row in rows.iterator()
+    }
+
+
+def rollup_buckets(users=None):
+    rollups = UsageRollup.objects.all()
+    if users:
+        rollups = rollups.filter(user_id__in=users)
+    return {
+        (r.user_id, r.service_type, r.day): (r.tokens, r.count, r.credited)
+        for r in rollups.iterator()
+    }
+
+
+class Command(BaseCommand):
+    help = 'Backfill UsageRollup from the TokenTransaction ledger and/or verify it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only this user id (repeatable)')
+        parser.add_argument('--verify', action='store_true',
+                            help='Compare rollups with the raw ledger without rebuilding')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        users = options['users']
+
+        if options['verify']:
+            expected = ledger_buckets(users)
+            actual = rollup_buckets(users)
+            mismatches = [
+                (key, expected.get(key), actual.get(key))
+                for key in expected.keys() | actual.keys()
+                if expected.get(key) != actual.get(key)
+            ]
+            for (user_id, service_type, day), want, got in sorted(mismatches, key=lambda m: str(m[0]))[:50]:
+                self.stdout.write(
+                    f'user={user_id} service={service_type} day={day}: ledger={want} rollup={got}'
+                )
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} of {len(expected)} buckets differ from the ledger')
+            self.stdout.write(self.style.SUCCESS(f'{len(expected)} buckets match the ledger'))
+            return
+
+        with transaction.atomic():
+            rollups = UsageRollup.objects.all()
+            if users:
+                rollups = rollups.filter(user_id__in=users)
+            rollups.delete()
+
+            buckets = [
+                UsageRollup(
+                    user_id=user_id, service_type=service_type, day=day,
+                    tokens=tokens, count=count, credited=credited
+                )
+                for (user_id, service_type, day), (tokens, count, credited) in ledger_buckets(users).items()
+            ]
+            UsageRollup.objects.bulk_create(buckets, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(buckets)} usage buckets'))
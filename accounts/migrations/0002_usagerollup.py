@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_type', models.CharField(choices=[('blog', '📝 Blog Writing'), ('image', '🎨 Image Generation'), ('resume', '📄 Resume Optimizer'), ('codehelper', '💻 Code Explain'), ('purchase', '💰 Token Purchase')], max_length=20)),
+                ('day', models.DateField()),
+                ('tokens', models.IntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('credited', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Usage Rollup',
+                'verbose_name_plural': 'Usage Rollups',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tokentransaction',
+            index=models.Index(fields=['user', '-created_at'], name='accounts_to_user_id_f05360_idx'),
+        ),
+        migrations.AddField(
+            model_name='usagerollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='usagerollup',
+            unique_together={('user', 'service_type', 'day')},
+        ),
+    ]
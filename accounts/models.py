@@ -13,29 +13,14 @@ class User(AbstractUser):
         return self.username
     
     def deduct_tokens(self, amount, service_type):
-        """Deduct tokens from user balance"""
-        if self.token_balance >= amount:
-            self.token_balance -= amount
-            self.save()
-            TokenTransaction.objects.create(
-                user=self,
-                amount=-amount,
-                service_type=service_type,
-                balance_after=self.token_balance
-            )
-            return True
-        return False
+        """Deduct tokens from user balance (atomic, see accounts/ledger.py)"""
+        from .ledger import debit
+        return debit(self, amount, service_type) is not None
     
-    def add_tokens(self, amount):
-        """Add tokens to user balance"""
-        self.token_balance += amount
-        self.save()
-        TokenTransaction.objects.create(
-            user=self,
-            amount=amount,
-            service_type='purchase',
-            balance_after=self.token_balance
-        )
+    def add_tokens(self, amount, service_type='purchase'):
+        """Add tokens to user balance (purchases, or refunds for a service)"""
+        from .ledger import credit
+        credit(self, amount, service_type)
 
 class TokenTransaction(models.Model):
     SERVICE_TYPES = [
@@ -62,8 +47,37 @@ class TokenTransaction(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),  # dashboard recent activity
+        ]
         verbose_name = 'Token Transaction'  # ✅ Added for admin
         verbose_name_plural = 'Token Transactions'  # ✅ Added for admin
     
     def __str__(self):
-        return f"{self.user.username} - {self.get_service_type_display()} - {self.amount}"
\ No newline at end of file
+        return f"{self.user.username} - {self.get_service_type_display()} - {self.amount}"
+
+class UsageRollup(models.Model):
+    """Per-user, per-service, per-day totals of token spending.
+    
+    Maintained by accounts/ledger.py in the same transaction as each ledger
+    insert, so the dashboard never has to scan the raw TokenTransaction table.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='usage_rollups'
+    )
+    service_type = models.CharField(max_length=20, choices=TokenTransaction.SERVICE_TYPES)
+    day = models.DateField()
+    tokens = models.IntegerField(default=0)  # tokens spent (positive)
+    count = models.IntegerField(default=0)  # debit ledger rows
+    credited = models.IntegerField(default=0)  # purchases and refunds
+    
+    class Meta:
+        ordering = ['-day']
+        unique_together = [('user', 'service_type', 'day')]
+        verbose_name = 'Usage Rollup'
+        verbose_name_plural = 'Usage Rollups'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.service_type} - {self.day}: {self.tokens}"
\ No newline at end of file
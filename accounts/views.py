@@ -3,8 +3,10 @@ from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django import forms
-from django.db.models import Sum, Count
-from .models import User, TokenTransaction
+from django.db.models import Sum
+from core import pagecache
+from core.db import read_only_view
+from .models import User, TokenTransaction, UsageRollup
 
 class CustomUserCreationForm(forms.ModelForm):
     """Custom User Creation Form for accounts.User"""
@@ -52,6 +54,7 @@ class CustomUserCreationForm(forms.ModelForm):
             user.save()
         return user
 
+@pagecache.cache_anonymous_page('home')
 def home(request):
     """Home page"""
     return render(request, 'accounts/home.html')
@@ -96,31 +99,36 @@ def logout_view(request):
     return redirect('home')
 
 @login_required
+@read_only_view
 def dashboard(request):
     """User dashboard with statistics"""
-    # Get user stats
-    total_tokens_used = TokenTransaction.objects.filter(
-        user=request.user, 
-        amount__lt=0
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    # Service usage stats - read from the rollup buckets, not the raw ledger
+    labels = dict(TokenTransaction.SERVICE_TYPES)
+    service_stats = [
+        {
+            'service_type': row['service_type'],
+            'label': labels.get(row['service_type'], row['service_type']),
+            'count': row['count'],
+            'tokens': row['tokens'],
+        }
+        for row in UsageRollup.objects.filter(
+            user=request.user,
+            count__gt=0
+        ).values('service_type').annotate(
+            count=Sum('count'),
+            tokens=Sum('tokens')
+        ).order_by('-tokens')
+    ]
+    total_tokens_used = sum(stat['tokens'] for stat in service_stats)
     
     # Recent transactions
     recent_transactions = TokenTransaction.objects.filter(
         user=request.user
     )[:10]
     
-    # Service usage stats
-    service_stats = TokenTransaction.objects.filter(
-        user=request.user,
-        amount__lt=0
-    ).values('service_type').annotate(
-        count=Count('id'),
-        tokens=Sum('amount')
-    )
-    
     context = {
         'user': request.user,
-        'total_tokens_used': abs(total_tokens_used),
+        'total_tokens_used': total_tokens_used,
         'recent_transactions': recent_transactions,
         'service_stats': service_stats,
     }
@@ -0,0 +1,40 @@
+from rest_framework import authentication, exceptions, throttling
+
+from codehelper import ratelimit
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """``X-API-Key: <key>`` or ``Authorization: Api-Key <key>``.
+
+    ``request.auth`` is the APIKey, so views can bill usage against it.
+    """
+
+    def authenticate(self, request):
+        key = ratelimit.key_from_request(request)
+        if not key:
+            return None
+        api_key = ratelimit.get_api_key(key)
+        if api_key is None:
+            raise exceptions.AuthenticationFailed('Invalid or expired API key')
+        api_key.increment_usage()
+        return api_key.user, api_key
+
+    def authenticate_header(self, request):
+        return 'Api-Key'
+
+
+class APIKeyRateThrottle(throttling.BaseThrottle):
+    """Token-bucket limit per API key (see codehelper/ratelimit.py).
+
+    Session-authenticated requests are not limited here.
+    """
+
+    def allow_request(self, request, view):
+        if not hasattr(request.auth, 'rate_limit'):
+            return True
+        allowed, self.retry_after, remaining = ratelimit.check(request.auth)
+        request.rate_limit_remaining = remaining
+        return allowed
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination newest first.
+
+    Pages are ``WHERE user = ? AND created_at < ?`` seeks on the
+    ``(user, -created_at)`` indexes, so deep pages cost the same as the first.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
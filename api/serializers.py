@@ -0,0 +1,76 @@
+from rest_framework import serializers
+
+from codehelper.models import CodeAnalysis, CodeSnippet, ProgrammingLanguage
+from content.models import BlogPost
+
+
+class SparseFieldsetsMixin:
+    """Honour ``?fields=a,b`` (only these) and ``?omit=a,b`` (all but these)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        keep, omit = requested_fields(request)
+        for name in list(self.fields):
+            if (keep and name not in keep) or name in omit:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """The ``(fields, omit)`` sets from the query string."""
+    def parse(param):
+        return {name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()}
+    return parse('fields'), parse('omit')
+
+
+class LanguageField(serializers.SlugRelatedField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'slug')
+        kwargs.setdefault('queryset', ProgrammingLanguage.objects.filter(is_active=True))
+        super().__init__(**kwargs)
+
+
+class CodeAnalysisSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    code = serializers.CharField(trim_whitespace=False)
+    language = LanguageField()
+    target_language = LanguageField(required=False, allow_null=True)
+
+    class Meta:
+        model = CodeAnalysis
+        fields = [
+            'id', 'title', 'code', 'language', 'analysis_type', 'target_language',
+            'status', 'result', 'suggestions', 'errors', 'complexity_score',
+            'security_score', 'tokens_used', 'execution_time', 'lines_of_code',
+            'batch', 'created_at', 'updated_at', 'completed_at',
+        ]
+        read_only_fields = [
+            'status', 'result', 'suggestions', 'errors', 'complexity_score',
+            'security_score', 'tokens_used', 'execution_time', 'lines_of_code',
+            'batch', 'created_at', 'updated_at', 'completed_at',
+        ]
+
+
+class CodeSnippetSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    code = serializers.CharField(trim_whitespace=False)
+    language = LanguageField(required=False, allow_null=True)
+    views = serializers.IntegerField(source='total_views', read_only=True)
+
+    class Meta:
+        model = CodeSnippet
+        fields = [
+            'id', 'title', 'description', 'code', 'language', 'tags', 'visibility',
+            'share_token', 'views', 'likes', 'fork_count', 'parent_snippet',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = [
+            'share_token', 'likes', 'fork_count', 'parent_snippet', 'created_at', 'updated_at',
+        ]
+
+
+class BlogPostSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = BlogPost
+        fields = ['id', 'title', 'prompt', 'content', 'tokens_used', 'created_at']
+        read_only_fields = fields
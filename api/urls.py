@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+router = DefaultRouter()
+router.register('analyses', views.CodeAnalysisViewSet, basename='api-analysis')
+router.register('snippets', views.CodeSnippetViewSet, basename='api-snippet')
+router.register('blogs', views.BlogPostViewSet, basename='api-blog')
+
+urlpatterns = [
+    path('<str:version>/', include(router.urls)),
+]
@@ -0,0 +1,116 @@
+"""
+Versioned REST API (``/api/v1/``) over analyses, snippets and blog posts.
+
+Callers authenticate with an APIKey (or a browser session) and only ever see
+their own rows. List endpoints use cursor pagination, ``?fields=``/``?omit=``
+trim the response (unrequested ``code``/``result``/``content`` columns are not
+even loaded), and GET responses carry an ETag so unchanged resources come back
+as ``304 Not Modified``.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from codehelper.jobs import enqueue_analysis
+from codehelper.models import CodeAnalysis, CodeSnippet
+from codehelper.services import GeminiCodeAnalyzer
+from content.models import BlogPost
+
+from .serializers import (
+    BlogPostSerializer, CodeAnalysisSerializer, CodeSnippetSerializer, requested_fields
+)
+
+
+class PaymentRequired(APIException):
+    status_code = status.HTTP_402_PAYMENT_REQUIRED
+    default_detail = 'Insufficient tokens. Please buy more.'
+    default_code = 'insufficient_tokens'
+
+
+class UserResourceViewSet(viewsets.GenericViewSet):
+    """Shared behaviour: owner scoping, sparse loading and ETags."""
+
+    # Large text columns skipped at the SQL level unless asked for
+    heavy_fields = ()
+    related_fields = ()
+    # ``code`` lives in CodeBlob: join it only when the response includes it
+    code_in_blob = False
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.related_fields:
+            queryset = queryset.select_related(*self.related_fields)
+        keep, omit = requested_fields(self.request) if self.request.method == 'GET' else (set(), set())
+        skipped = [f for f in self.heavy_fields if (keep and f not in keep) or f in omit]
+        if skipped:
+            queryset = queryset.defer(*skipped)
+        if self.code_in_blob and not ((keep and 'code' not in keep) or 'code' in omit):
+            queryset = queryset.select_related('blob')
+        return queryset
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method in ('GET', 'HEAD') and response.status_code == 200 and response.data is not None:
+            payload = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True)
+            etag = '"%s"' % hashlib.md5(payload.encode()).hexdigest()
+            if etag in request.headers.get('If-None-Match', ''):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+        remaining = getattr(request, 'rate_limit_remaining', None)
+        if remaining is not None:
+            response['X-RateLimit-Remaining'] = str(remaining)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CodeAnalysisViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                          mixins.RetrieveModelMixin, UserResourceViewSet):
+    """Submit code for analysis and poll the results.
+
+    Creating an analysis charges tokens like the web form and queues it for
+    the worker pool; poll the detail URL until ``status`` is ``completed``.
+    """
+    queryset = CodeAnalysis.objects.all()
+    serializer_class = CodeAnalysisSerializer
+    heavy_fields = ('result',)
+    related_fields = ('language', 'target_language')
+    code_in_blob = True
+
+    def perform_create(self, serializer):
+        token_cost = settings.TOKEN_COSTS.get('code', 40)
+        if not self.request.user.deduct_tokens(token_cost, 'codehelper'):
+            raise PaymentRequired()
+        if hasattr(self.request.auth, 'rate_limit'):
+            self.request.auth.increment_usage(tokens=token_cost, requests=0)
+
+        analysis = serializer.save(user=self.request.user, tokens_used=token_cost, status='pending')
+        cached = GeminiCodeAnalyzer.known_result(analysis)
+        if cached:
+            analysis.result = cached
+            analysis.execution_time = 0
+            analysis.mark_completed()
+        else:
+            enqueue_analysis(analysis)
+
+
+class CodeSnippetViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                         mixins.RetrieveModelMixin, mixins.UpdateModelMixin,
+                         mixins.DestroyModelMixin, UserResourceViewSet):
+    queryset = CodeSnippet.objects.all()
+    serializer_class = CodeSnippetSerializer
+    heavy_fields = ('description',)
+    related_fields = ('language',)
+    code_in_blob = True
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class BlogPostViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin, UserResourceViewSet):
+    queryset = BlogPost.objects.all()
+    serializer_class = BlogPostSerializer
+    heavy_fields = ('content', 'prompt')
@@ -1,9 +1,25 @@
+from django import forms
 from django.contrib import admin
 from .models import (
-    ProgrammingLanguage, CodeAnalysis, CodeSnippet, 
-    CodeReview, UserPreference, APIKey
+    ProgrammingLanguage, CodeAnalysis, AnalysisBatch, CodeSnippet, SnippetLike,
+    CodeReview, UserPreference, UserCodeStats, APIKey
 )
 
+class BlobCodeForm(forms.ModelForm):
+    """Edits ``code``, which is stored in CodeBlob rather than on the row"""
+    code = forms.CharField(widget=forms.Textarea)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.blob_id:
+            self.fields['code'].initial = self.instance.code
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'code' in cleaned_data:
+            self.instance.code = cleaned_data['code']
+        return cleaned_data
+
 @admin.register(ProgrammingLanguage)
 class ProgrammingLanguageAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'is_active', 'created_at']
@@ -13,9 +29,10 @@ class ProgrammingLanguageAdmin(admin.ModelAdmin):
 
 @admin.register(CodeAnalysis)
 class CodeAnalysisAdmin(admin.ModelAdmin):
+    form = BlobCodeForm
     list_display = ['id', 'user', 'language', 'analysis_type', 'status', 'tokens_used', 'created_at']
     list_filter = ['analysis_type', 'status', 'language', 'created_at']
-    search_fields = ['user__username', 'title', 'code']
+    search_fields = ['user__username', 'title']
     readonly_fields = ['created_at', 'updated_at', 'completed_at']
     fieldsets = (
         ('User Information', {
@@ -35,11 +52,19 @@ class CodeAnalysisAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(AnalysisBatch)
+class AnalysisBatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'analysis_type', 'total_files', 'tokens_used', 'status', 'created_at']
+    list_filter = ['status', 'analysis_type', 'created_at']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at', 'completed_at']
+
 @admin.register(CodeSnippet)
 class CodeSnippetAdmin(admin.ModelAdmin):
+    form = BlobCodeForm
     list_display = ['title', 'user', 'language', 'visibility', 'views', 'likes', 'fork_count', 'created_at']
     list_filter = ['language', 'visibility', 'created_at']
-    search_fields = ['title', 'description', 'code', 'user__username']
+    search_fields = ['title', 'description', 'user__username']
     readonly_fields = ['views', 'likes', 'fork_count', 'share_token', 'created_at', 'updated_at']  # ✅ FIXED: 'forks' hataya, 'fork_count' add kiya
     fieldsets = (
         ('Basic Information', {
@@ -59,15 +84,27 @@ class CodeSnippetAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(SnippetLike)
+class SnippetLikeAdmin(admin.ModelAdmin):
+    list_display = ['user', 'snippet', 'created_at']
+    search_fields = ['user__username', 'snippet__title']
+    raw_id_fields = ['user', 'snippet']
+
 @admin.register(UserPreference)
 class UserPreferenceAdmin(admin.ModelAdmin):
     list_display = ['user', 'theme', 'editor_mode', 'default_language', 'updated_at']
     list_filter = ['theme', 'editor_mode', 'auto_save']
     search_fields = ['user__username']
 
+@admin.register(UserCodeStats)
+class UserCodeStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'analysis_count', 'snippet_count']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+
 @admin.register(APIKey)
 class APIKeyAdmin(admin.ModelAdmin):
-    list_display = ['name', 'user', 'is_active', 'last_used', 'requests_count', 'created_at']
+    list_display = ['name', 'user', 'is_active', 'rate_limit', 'last_used', 'requests_count', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'user__username', 'key']
     readonly_fields = ['key', 'requests_count', 'tokens_used', 'last_used']
\ No newline at end of file
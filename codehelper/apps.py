@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class CodehelperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'codehelper'
+    name = 'codehelper'
+
+    def ready(self):
+        from . import refdata, signals  # noqa: F401
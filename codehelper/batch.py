@@ -0,0 +1,177 @@
+"""
+Batch code analysis.
+
+A batch is one AnalysisBatch with a pending CodeAnalysis child per file. The
+children are inserted with a single bulk_create and paid for with a single
+ledger debit. After that they are ordinary jobs for the worker pool in
+``codehelper/jobs.py``, which already processes them concurrently with
+``CODEHELPER_JOBS['WORKERS']`` as the parallelism bound.
+"""
+import posixpath
+import zipfile
+
+from django.conf import settings
+from django.db import transaction
+
+from .jobs import enqueue_analyses
+from .models import AnalysisBatch, CodeAnalysis, CodeBlob, ProgrammingLanguage, UserCodeStats
+from .services import GeminiCodeAnalyzer
+
+DEFAULTS = {
+    'MAX_FILES': 500,
+    'MAX_FILE_SIZE': 200 * 1024,
+    'MAX_TOTAL_SIZE': 20 * 1024 * 1024,
+}
+
+# File extension -> ProgrammingLanguage.slug
+EXTENSIONS = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.cc': 'cpp',
+    '.h': 'cpp',
+    '.hpp': 'cpp',
+    '.c': 'c',
+    '.cs': 'csharp',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.html': 'html',
+    '.css': 'css',
+    '.sql': 'sql',
+}
+
+
+class BatchError(Exception):
+    pass
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CODEHELPER_BATCH', {}))
+    return config
+
+
+def _decode(data):
+    if b'\x00' in data[:1024]:
+        return None  # binary
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def read_uploads(uploaded_files=(), archive=None):
+    """Collect ``(filename, code)`` pairs from uploaded files and/or a zip.
+
+    Returns ``(files, skipped)`` where ``skipped`` lists ``(filename, reason)``.
+    """
+    config = get_config()
+    files, skipped = [], []
+    total = 0
+
+    def add(name, size, read):
+        nonlocal total
+        if len(files) >= config['MAX_FILES']:
+            skipped.append((name, f"over the {config['MAX_FILES']} file limit"))
+        elif size > config['MAX_FILE_SIZE']:
+            skipped.append((name, 'file too large'))
+        elif total + size > config['MAX_TOTAL_SIZE']:
+            skipped.append((name, 'batch too large'))
+        else:
+            code = _decode(read())
+            if not code or not code.strip():
+                skipped.append((name, 'empty or not a text file'))
+            else:
+                total += size
+                files.append((name, code))
+
+    for upload in uploaded_files:
+        add(upload.name, upload.size, upload.read)
+
+    if archive is not None:
+        try:
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    name = info.filename
+                    base = posixpath.basename(name)
+                    if info.is_dir() or name.startswith('__MACOSX/') or base.startswith('.'):
+                        continue
+                    # Sizes come from the zip directory, checked before inflating
+                    add(name, info.file_size, lambda info=info: zf.read(info))
+        except zipfile.BadZipFile:
+            raise BatchError('Uploaded archive is not a valid zip file')
+
+    return files, skipped
+
+
+def create_batch(user, files, analysis_type='explain', language=None):
+    """Charge for and queue one analysis per ``(filename, code)`` pair.
+
+    ``language`` is used for files whose extension is not recognised.
+    Returns the AnalysisBatch, or None if the user cannot afford it.
+    """
+    slugs = {EXTENSIONS.get(posixpath.splitext(name)[1].lower()) for name, _ in files}
+    languages = {
+        lang.slug: lang
+        for lang in ProgrammingLanguage.objects.filter(slug__in=slugs - {None})
+    }
+    token_cost = settings.TOKEN_COSTS.get('code', 40)
+
+    # Results of earlier completed analyses of the same code, newest wins
+    reusable = {
+        (earlier.blob_id, earlier.language_id): earlier.result
+        for earlier in CodeAnalysis.objects.filter(
+            blob_id__in={CodeBlob.hash_code(code) for _, code in files},
+            analysis_type=analysis_type,
+            target_language=None,
+            status='completed'
+        ).exclude(result='').order_by('completed_at').only('blob_id', 'language_id', 'result')
+    }
+
+    with transaction.atomic():
+        if not user.deduct_tokens(token_cost * len(files), 'codehelper'):
+            return None
+
+        batch = AnalysisBatch.objects.create(
+            user=user,
+            analysis_type=analysis_type,
+            total_files=len(files),
+            tokens_used=token_cost * len(files)
+        )
+
+        children = []
+        for name, code in files:
+            lang = languages.get(EXTENSIONS.get(posixpath.splitext(name)[1].lower()), language)
+            child = CodeAnalysis(
+                user=user,
+                batch=batch,
+                title=name[:200],
+                code=code,
+                language=lang,
+                analysis_type=analysis_type,
+                tokens_used=token_cost,
+                status='pending'
+            )
+            # Identical files analysed before are answered without the model
+            cached = reusable.get((child.blob_id, child.language_id)) or GeminiCodeAnalyzer.cached_result(
+                code, lang.name if lang else None, analysis_type
+            )
+            if cached:
+                child.result = cached
+                child.status = 'completed'
+                child.execution_time = 0
+                child.completed_at = batch.created_at
+            child.set_list_fields()  # bulk_create skips save()
+            children.append(child)
+
+        CodeBlob.store_many(code for _, code in files)
+        children = CodeAnalysis.objects.bulk_create(children)
+        UserCodeStats.bump(user.pk, analysis_count=len(children))
+        enqueue_analyses(children)
+
+    return batch
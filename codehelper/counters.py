@@ -0,0 +1,143 @@
+"""
+Write-coalescing counters.
+
+``view_counter.increment(snippet_id)`` only adds to an in-memory buffer. A
+background thread flushes the buffer every ``FLUSH_INTERVAL`` seconds as a
+handful of ``UPDATE ... SET views = views + n WHERE id IN (...)`` statements,
+one per distinct delta. Using ``QuerySet.update`` means ``updated_at`` is left
+alone and hot snippets no longer take the SQLite write lock on every hit.
+
+A counter can cover several columns of the same row and stamp a "last used"
+column on flush; ``api_usage`` does this for APIKey request/token counts.
+
+Pending deltas are per process. They are flushed at interpreter exit, and
+dropped in forked children so a preloaded parent's buffer is never counted
+twice.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'FLUSH_INTERVAL': 5,
+    'MAX_PENDING': 1000,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CODEHELPER_COUNTERS', {}))
+    return config
+
+
+class BufferedCounter:
+    """Buffers increments of integer columns and applies them in batches."""
+
+    def __init__(self, model, *fields, timestamp_field=None):
+        self.model_label = model
+        self.fields = fields
+        self.timestamp_field = timestamp_field
+        self._reset()
+        atexit.register(self.flush)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._touched = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._pid = os.getpid()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def increment(self, pk, n=1, **deltas):
+        """Add ``n`` to the first field, or the given per-field ``deltas``."""
+        if self._pid != os.getpid():
+            self._reset()
+        deltas = deltas or {self.fields[0]: n}
+        with self._lock:
+            pending = self._pending.setdefault(pk, dict.fromkeys(self.fields, 0))
+            for field, delta in deltas.items():
+                pending[field] += delta
+            if self.timestamp_field:
+                self._touched[pk] = timezone.now()
+            full = len(self._pending) >= get_config()['MAX_PENDING']
+        self._ensure_thread()
+        if full:
+            self.flush()
+
+    def pending(self, pk, field=None):
+        """Increments for ``pk`` not yet written to the database."""
+        return self._pending.get(pk, {}).get(field or self.fields[0], 0)
+
+    def flush(self):
+        """Write every pending delta. Returns the number of rows touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+        if not pending:
+            return 0
+
+        # Rows with identical deltas share one UPDATE
+        groups = defaultdict(list)
+        for pk, deltas in pending.items():
+            groups[tuple(deltas[field] for field in self.fields)].append(pk)
+        try:
+            for deltas, pks in groups.items():
+                values = {
+                    field: F(field) + delta
+                    for field, delta in zip(self.fields, deltas) if delta
+                }
+                if self.timestamp_field:
+                    values[self.timestamp_field] = max(touched[pk] for pk in pks)
+                self.model.objects.filter(pk__in=pks).update(**values)
+        except Exception:
+            logger.exception('Failed to flush %s counters', self.model_label)
+            with self._lock:
+                for pk, deltas in pending.items():
+                    current = self._pending.setdefault(pk, dict.fromkeys(self.fields, 0))
+                    for field, delta in deltas.items():
+                        current[field] += delta
+                    if pk in touched:
+                        self._touched.setdefault(pk, touched[pk])
+            return 0
+        return len(pending)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name=f'{self.fields[0]}-counter-flush', daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        interval = get_config()['FLUSH_INTERVAL']
+        while not self._stop.wait(interval):
+            self.flush()
+            connection.close()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+view_counter = BufferedCounter('codehelper.CodeSnippet', 'views')
+api_usage = BufferedCounter(
+    'codehelper.APIKey', 'requests_count', 'tokens_used', timestamp_field='last_used'
+)
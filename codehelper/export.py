@@ -0,0 +1,238 @@
+"""
+Bulk export of a user's analyses, snippets and blog posts.
+
+Everything here is a generator of ``bytes`` chunks, so the same code feeds a
+``StreamingHttpResponse`` (``export_all`` view) and a file
+(``manage.py export_user_data``). Rows come from ``.iterator(chunk_size=...)``
+querysets ordered by primary key and are serialised and compressed one at a
+time: memory use depends on ``CHUNK_SIZE``, not on how many rows a user has.
+
+Formats:
+
+* ``ndjson`` - one JSON object per line with a ``type`` of ``analysis``,
+  ``snippet`` or ``blog``; gzipped on the fly unless ``compress=False``.
+  Snippet lines are the format ``codehelper/importer.py`` reads back.
+* ``zip`` - source files (``snippets/12-title.py``, ``analyses/7-title.py``
+  with ``analyses/7-title.result.md``, ``blogs/3-title.md``) deflated entry by
+  entry and written to a non-seekable stream, so the archive is never held in
+  memory. The one thing that grows is the zip's central directory (name, CRC
+  and offset of each file, a few hundred bytes per entry), which the format
+  only allows writing at the end.
+"""
+import json
+import posixpath
+import zipfile
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.text import slugify
+
+from content.models import BlogPost
+
+from .batch import EXTENSIONS
+from .models import CodeAnalysis, CodeSnippet
+
+CHUNK_SIZE = 500
+
+KINDS = ('analyses', 'snippets', 'blogs')
+
+# ProgrammingLanguage.slug -> file extension (first one listed in batch.py)
+FILE_EXTENSIONS = {}
+for _ext, _slug in EXTENSIONS.items():
+    FILE_EXTENSIONS.setdefault(_slug, _ext)
+
+
+def _slug(obj):
+    return obj.slug if obj else None
+
+
+def analysis_records(user):
+    analyses = (
+        CodeAnalysis.objects.filter(user=user)
+        .select_related('blob', 'language', 'target_language')
+        .order_by('pk')
+    )
+    for analysis in analyses.iterator(chunk_size=CHUNK_SIZE):
+        yield analysis, {
+            'type': 'analysis',
+            'id': analysis.pk,
+            'title': analysis.title,
+            'language': _slug(analysis.language),
+            'target_language': _slug(analysis.target_language),
+            'analysis_type': analysis.analysis_type,
+            'status': analysis.status,
+            'code': analysis.code,
+            'result': analysis.result,
+            'suggestions': analysis.suggestions,
+            'errors': analysis.errors,
+            'complexity_score': analysis.complexity_score,
+            'security_score': analysis.security_score,
+            'tokens_used': analysis.tokens_used,
+            'execution_time': analysis.execution_time,
+            'created_at': analysis.created_at,
+            'completed_at': analysis.completed_at,
+        }
+
+
+def snippet_records(user):
+    snippets = (
+        CodeSnippet.objects.filter(user=user)
+        .select_related('blob', 'language')
+        .order_by('pk')
+    )
+    for snippet in snippets.iterator(chunk_size=CHUNK_SIZE):
+        yield snippet, {
+            'type': 'snippet',
+            'id': snippet.pk,
+            'title': snippet.title,
+            'description': snippet.description,
+            'language': _slug(snippet.language),
+            'tags': snippet.tags,
+            'visibility': snippet.visibility,
+            'code': snippet.code,
+            'views': snippet.views,
+            'likes': snippet.likes,
+            'fork_count': snippet.fork_count,
+            'parent_snippet': snippet.parent_snippet_id,
+            'created_at': snippet.created_at,
+            'updated_at': snippet.updated_at,
+        }
+
+
+def blog_records(user):
+    posts = BlogPost.objects.filter(user=user).order_by('pk')
+    for post in posts.iterator(chunk_size=CHUNK_SIZE):
+        yield post, {
+            'type': 'blog',
+            'id': post.pk,
+            'title': post.title,
+            'prompt': post.prompt,
+            'content': post.content,
+            'tokens_used': post.tokens_used,
+            'created_at': post.created_at,
+        }
+
+
+RECORDS = {
+    'analyses': analysis_records,
+    'snippets': snippet_records,
+    'blogs': blog_records,
+}
+
+
+def parse_kinds(value):
+    """``'snippets,blogs'`` -> ``['snippets', 'blogs']``; empty means all."""
+    kinds = [kind.strip() for kind in (value or '').split(',') if kind.strip()]
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown export type(s): {', '.join(sorted(unknown))}")
+    return kinds or list(KINDS)
+
+
+# ============================================
+# NDJSON
+# ============================================
+
+def ndjson_lines(user, kinds=KINDS):
+    for kind in kinds:
+        for _, record in RECORDS[kind](user):
+            yield (json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode()
+
+
+def gzip_stream(chunks, level=6, min_chunk=64 * 1024):
+    """Gzip an iterable of bytes, yielding compressed output about every ``min_chunk`` bytes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+    pending = []
+    size = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            pending.append(data)
+            size += len(data)
+        if size >= min_chunk:
+            yield b''.join(pending)
+            pending, size = [], 0
+    pending.append(compressor.flush())
+    yield b''.join(pending)
+
+
+def export_ndjson(user, kinds=KINDS, compress=True):
+    lines = ndjson_lines(user, kinds)
+    return gzip_stream(lines) if compress else lines
+
+
+# ============================================
+# ZIP
+# ============================================
+
+class _StreamBuffer:
+    """Write-only file for ZipFile; ``drain()`` hands over what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _filename(obj, title, ext):
+    name = slugify(title or '')[:60]
+    return f'{obj.pk}-{name}{ext}' if name else f'{obj.pk}{ext}'
+
+
+def zip_entries(user, kinds=KINDS):
+    """Yield ``(path, text, modified)`` for each file in the archive."""
+    for kind in kinds:
+        for obj, record in RECORDS[kind](user):
+            if kind == 'blogs':
+                yield posixpath.join('blogs', _filename(obj, obj.title, '.md')), record['content'], obj.created_at
+                continue
+            ext = FILE_EXTENSIONS.get(record['language'], '.txt')
+            path = posixpath.join(kind, _filename(obj, record['title'], ext))
+            modified = record.get('updated_at') or record['created_at']
+            yield path, record['code'], modified
+            if kind == 'analyses' and record['result']:
+                yield posixpath.splitext(path)[0] + '.result.md', record['result'], modified
+
+
+def export_zip(user, kinds=KINDS):
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, text, modified in zip_entries(user, kinds):
+            info = zipfile.ZipInfo(path, date_time=modified.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as entry:
+                entry.write((text or '').encode())
+            data = buffer.drain()
+            if data:
+                yield data
+    # The central directory is written on close
+    yield buffer.drain()
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', '.ndjson'),
+    'zip': ('application/zip', '.zip'),
+}
+
+
+def export(user, format='ndjson', kinds=KINDS, compress=True):
+    """Return ``(chunks, content_type, filename)`` for a user's export."""
+    if format not in FORMATS:
+        raise ValueError(f'Unknown export format {format!r}')
+    content_type, ext = FORMATS[format]
+    filename = f'aiforge-{user.username}{ext}'
+    if format == 'zip':
+        return export_zip(user, kinds), content_type, filename
+    if compress:
+        return export_ndjson(user, kinds), 'application/gzip', filename + '.gz'
+    return export_ndjson(user, kinds, compress=False), content_type, filename
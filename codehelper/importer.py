@@ -0,0 +1,321 @@
+"""
+Bulk snippet import.
+
+``import_snippets(user, source)`` loads snippets from one uploaded file:
+
+* NDJSON (optionally gzipped) - one object per line with ``title``, ``code``
+  and optional ``description``, ``language`` (a ProgrammingLanguage slug),
+  ``tags``, ``visibility``. The snippet lines of ``codehelper/export.py``
+  output import as they are; its analysis and blog lines are skipped.
+* zip - every text file becomes a snippet titled after the file, with the
+  language taken from its extension (the table in ``codehelper/batch.py``).
+* gist-style JSON - one gist or a list of gists shaped like the GitHub API
+  (``description``, ``public``, ``files: {name: {content, language}}``); each
+  file becomes a snippet, public gists become shared snippets. Gist
+  language names are mapped where we know them and otherwise ignored.
+
+Records are read lazily and inserted ``BATCH_SIZE`` at a time: one
+``CodeBlob.store_many``, one ``bulk_create`` (share tokens are minted in
+memory first, so there is no second save per snippet), one
+``UserCodeStats.bump`` and one search-index write per batch. A record that
+fails validation is reported with its line or file name and the rest carry on;
+if a batch insert fails, that batch is retried one record at a time so only
+the offending records are lost.
+"""
+import gzip
+import io
+import json
+import posixpath
+import uuid
+import zipfile
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils.text import slugify
+
+from .batch import EXTENSIONS
+from .models import CodeBlob, CodeSnippet, UserCodeStats
+from .refdata import active_languages
+from .search import index_snippets
+
+DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'MAX_RECORDS': 10000,
+    'MAX_CODE_SIZE': 200 * 1024,
+}
+
+VISIBILITIES = {value for value, _ in CodeSnippet.VISIBILITY_CHOICES}
+
+# Gist/linguist language names that do not slugify to our slugs
+LANGUAGE_ALIASES = {
+    'c++': 'cpp',
+    'c#': 'csharp',
+    'golang': 'go',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+}
+
+
+class SnippetImportError(Exception):
+    pass
+
+
+class ImportReport:
+    """Counts of created and skipped records plus ``(ref, message)`` errors"""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def error(self, ref, message):
+        self.errors.append((ref, message))
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'errors': [{'record': ref, 'error': message} for ref, message in self.errors],
+        }
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CODEHELPER_IMPORT', {}))
+    return config
+
+
+# ============================================
+# READERS: yield (ref, record dict or None for "skip")
+# ============================================
+
+def _text(data):
+    if b'\x00' in data[:1024]:
+        return None
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def read_ndjson(stream):
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8', errors='replace'), 1):
+        line = line.strip()
+        if not line:
+            continue
+        ref = f'line {number}'
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield ref, ValueError('not valid JSON')
+            continue
+        if not isinstance(record, dict):
+            yield ref, ValueError('not a JSON object')
+        elif record.get('type', 'snippet') != 'snippet':
+            yield ref, None
+        else:
+            yield ref, record
+
+
+def read_zip(stream, max_size):
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise SnippetImportError('Uploaded archive is not a valid zip file')
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            base = posixpath.basename(name)
+            if info.is_dir() or name.startswith('__MACOSX/') or base.startswith('.'):
+                continue
+            # Checked against the zip directory before inflating anything
+            if info.file_size > max_size:
+                yield name, ValueError('file too large')
+                continue
+            code = _text(archive.read(info))
+            if code is None:
+                yield name, ValueError('not a UTF-8 text file')
+                continue
+            yield name, {'title': posixpath.splitext(base)[0], 'filename': base, 'code': code}
+
+
+def read_gists(stream):
+    try:
+        data = json.load(io.TextIOWrapper(stream, encoding='utf-8'))
+    except ValueError:
+        raise SnippetImportError('Gist archive is not valid JSON')
+    for index, gist in enumerate(data if isinstance(data, list) else [data]):
+        files = gist.get('files') if isinstance(gist, dict) else None
+        if not isinstance(files, dict):
+            yield f'gist {index}', ValueError('no files')
+            continue
+        description = gist.get('description') or ''
+        for name, item in files.items():
+            item = item or {}
+            yield f"gist {gist.get('id', index)}/{name}", {
+                'title': description or name,
+                'description': description if description != name else '',
+                'filename': item.get('filename') or name,
+                'language_hint': item.get('language'),
+                'code': item.get('content'),
+                'visibility': 'shared' if gist.get('public') else 'private',
+            }
+
+
+def read_records(source, filename=''):
+    """Sniff the format of ``source`` (a binary file) and yield its records."""
+    head = source.read(4)
+    source.seek(0)
+    if head.startswith(b'PK'):
+        yield from read_zip(source, get_config()['MAX_CODE_SIZE'])
+        return
+    if head.startswith(b'\x1f\x8b'):
+        source = gzip.GzipFile(fileobj=source)
+        filename = filename[:-3] if filename.endswith('.gz') else filename
+    if _is_gist_json(source, filename):
+        yield from read_gists(source)
+    else:
+        yield from read_ndjson(source)
+
+
+def _is_gist_json(source, filename):
+    if filename.endswith(('.json', '.ndjson')):
+        return filename.endswith('.json')
+    first = source.readline(1 << 20).strip()
+    source.seek(0)
+    if first.startswith(b'['):
+        return True
+    try:
+        record = json.loads(first)
+    except ValueError:
+        return first.startswith(b'{')  # a pretty-printed object spans lines
+    return isinstance(record, dict) and 'files' in record
+
+
+# ============================================
+# VALIDATION AND INSERT
+# ============================================
+
+def resolve_language(record, languages):
+    """The ProgrammingLanguage for a record, or raise ValueError for an unknown slug.
+
+    Gist language names are only hints: one we do not know falls back to the
+    file extension, then to no language.
+    """
+    name = record.get('language')
+    if name:
+        language = languages.get(_language_slug(name))
+        if language is None:
+            raise ValueError(f'unknown language {name!r}')
+        return language
+    hint = record.get('language_hint')
+    if hint and _language_slug(hint) in languages:
+        return languages[_language_slug(hint)]
+    ext_slug = EXTENSIONS.get(posixpath.splitext(record.get('filename') or '')[1].lower())
+    return languages.get(ext_slug)
+
+
+def _language_slug(name):
+    name = str(name).lower()
+    return LANGUAGE_ALIASES.get(name, slugify(name))
+
+
+def build_snippet(user, record, languages, default_visibility, max_size):
+    code = record.get('code')
+    if not isinstance(code, str) or not code.strip():
+        raise ValueError('code is required')
+    if len(code.encode()) > max_size:
+        raise ValueError('code too large')
+    title = str(record.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+
+    visibility = record.get('visibility') or default_visibility
+    if visibility not in VISIBILITIES:
+        raise ValueError(f'invalid visibility {visibility!r}')
+    tags = record.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+    if not isinstance(tags, list):
+        raise ValueError('tags must be a list or a comma-separated string')
+
+    snippet = CodeSnippet(
+        user=user,
+        title=title[:200],
+        description=str(record.get('description') or ''),
+        language=resolve_language(record, languages),
+        tags=[str(tag) for tag in tags],
+        visibility=visibility,
+        share_token=uuid.uuid4().hex if visibility == 'shared' else None,
+    )
+    snippet.code = code
+    snippet.set_list_fields()  # bulk_create skips save()
+    return snippet
+
+
+def insert_batch(user, batch):
+    """Insert ``[(ref, snippet)]``; returns ``(created, [(ref, error)])``."""
+    snippets = [snippet for _, snippet in batch]
+    try:
+        with transaction.atomic():
+            CodeBlob.store_many(snippet.code for snippet in snippets)
+            created = CodeSnippet.objects.bulk_create(snippets)
+            UserCodeStats.bump(user.pk, snippet_count=len(created))
+            index_snippets(created)
+        return len(created), []
+    except DatabaseError:
+        if len(batch) == 1:
+            raise
+    # Find the bad rows one at a time
+    created, errors = 0, []
+    for ref, snippet in batch:
+        snippet.pk = None
+        try:
+            count, _ = insert_batch(user, [(ref, snippet)])
+            created += count
+        except DatabaseError as e:
+            errors.append((ref, f'database error: {e}'))
+    return created, errors
+
+
+def import_snippets(user, source, filename='', default_visibility='private', batch_size=None):
+    """Import every snippet in ``source``; returns an ImportReport.
+
+    Raises SnippetImportError only when the file as a whole cannot be read.
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    languages = {lang.slug: lang for lang in active_languages.all()}
+    report = ImportReport()
+    batch = []
+    seen = 0
+
+    def flush():
+        created, errors = insert_batch(user, batch)
+        report.created += created
+        report.errors.extend(errors)
+        batch.clear()
+
+    for ref, record in read_records(source, filename.lower()):
+        if record is None:
+            report.skipped += 1
+            continue
+        if isinstance(record, Exception):
+            report.error(ref, str(record))
+            continue
+        seen += 1
+        if seen > config['MAX_RECORDS']:
+            report.error(ref, f"over the {config['MAX_RECORDS']} record limit; the rest were not imported")
+            break
+        try:
+            batch.append((ref, build_snippet(
+                user, record, languages, default_visibility, config['MAX_CODE_SIZE']
+            )))
+        except ValueError as e:
+            report.error(ref, str(e))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
@@ -0,0 +1,254 @@
+"""
+Background job pipeline for CodeAnalysis requests.
+
+``analyze_code`` only stores the submission as a ``pending`` row and returns.
+A pool of worker threads (``python manage.py run_analysis_workers``) claims
+pending rows, moves them to ``processing`` and finishes them with
+``mark_completed`` / ``mark_failed``.
+
+The CodeAnalysis table is always the source of truth for job state. The queue
+backend only decides how workers hear about new work:
+
+* ``db``    - workers poll the table for pending rows (default, no extra services)
+* ``redis`` - ids are pushed onto a Redis list and workers block on it
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import CodeAnalysis
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'db',
+    'REDIS_URL': 'redis://localhost:6379/0',
+    'REDIS_KEY': 'codehelper:analysis_jobs',
+    'WORKERS': 4,
+    'POLL_INTERVAL': 1.0,
+    'BATCH_SIZE': 10,
+    'STALE_AFTER': 600,
+    'EAGER': False,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CODEHELPER_JOBS', {}))
+    return config
+
+
+# ============================================
+# QUEUE BACKENDS
+# ============================================
+
+class DatabaseQueue:
+    """Local mode: the pending CodeAnalysis rows are the queue."""
+
+    def __init__(self, config):
+        self.poll_interval = config['POLL_INTERVAL']
+        self.batch_size = config['BATCH_SIZE']
+
+    def push(self, *analysis_ids):
+        # The pending rows written by the view are already the queue entries.
+        pass
+
+    def pending_ids(self):
+        return list(
+            CodeAnalysis.objects.filter(status='pending')
+            .order_by('created_at')
+            .values_list('id', flat=True)[:self.batch_size]
+        )
+
+    def candidates(self, stop_event):
+        """Return ids worth trying to claim, sleeping while there are none."""
+        ids = self.pending_ids()
+        if not ids:
+            stop_event.wait(self.poll_interval)
+        return ids
+
+
+class RedisQueue(DatabaseQueue):
+    """Workers block on a Redis list instead of polling the database."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        import redis
+
+        self.key = config['REDIS_KEY']
+        self.client = redis.Redis.from_url(config['REDIS_URL'])
+
+    def push(self, *analysis_ids):
+        if analysis_ids:
+            self.client.rpush(self.key, *analysis_ids)
+
+    def candidates(self, stop_event):
+        item = self.client.blpop(self.key, timeout=max(1, int(self.poll_interval)))
+        if item:
+            return [int(item[1])]
+        # Nothing announced; sweep the table so rows pushed while Redis was
+        # unavailable are never stranded.
+        return self.pending_ids()
+
+
+QUEUE_BACKENDS = {
+    'db': DatabaseQueue,
+    'redis': RedisQueue,
+}
+
+_queue = None
+_queue_pid = None
+
+
+def get_queue():
+    """Return the configured queue, rebuilt after a fork."""
+    global _queue, _queue_pid
+    if _queue is None or _queue_pid != os.getpid():
+        config = get_config()
+        _queue = QUEUE_BACKENDS[config['BACKEND']](config)
+        _queue_pid = os.getpid()
+    return _queue
+
+
+# ============================================
+# JOB LIFECYCLE
+# ============================================
+
+def enqueue_analysis(analysis):
+    """Hand a freshly created pending analysis to the workers."""
+    enqueue_analyses([analysis])
+
+
+def enqueue_analyses(analyses):
+    """Hand a group of pending analyses (e.g. a batch) to the workers at once."""
+    ids = [analysis.pk for analysis in analyses if analysis.status == 'pending']
+    if get_config()['EAGER']:
+        for analysis_id in ids:
+            if claim_analysis(analysis_id):
+                process_analysis(analysis_id)
+        return
+    transaction.on_commit(lambda: get_queue().push(*ids))
+
+
+def claim_analysis(analysis_id):
+    """Atomically move one job from pending to processing."""
+    claimed = CodeAnalysis.objects.filter(pk=analysis_id, status='pending').update(
+        status='processing',
+        updated_at=timezone.now(),
+    )
+    return claimed == 1
+
+
+def requeue_stale(max_age=None):
+    """Put jobs whose worker died mid-run back in the queue."""
+    if max_age is None:
+        max_age = get_config()['STALE_AFTER']
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return CodeAnalysis.objects.filter(status='processing', updated_at__lt=cutoff).update(
+        status='pending',
+        updated_at=timezone.now(),
+    )
+
+
+def process_analysis(analysis_id, analyzer=None):
+    """Run a claimed job and record its outcome."""
+    from .services import GeminiCodeAnalyzer
+
+    analysis = CodeAnalysis.objects.select_related('blob', 'language', 'target_language').get(pk=analysis_id)
+    started = time.monotonic()
+    try:
+        analyzer = analyzer or GeminiCodeAnalyzer()
+        # An identical job may have finished while this one was queued
+        analysis.result = analysis.find_reusable_result() or analyzer.analyze(
+            analysis.code,
+            analysis.language.name if analysis.language else None,
+            analysis.analysis_type,
+            analysis.target_language.name if analysis.target_language else None,
+        )
+    except Exception as e:
+        logger.exception('Analysis %s failed', analysis_id)
+        analysis.execution_time = time.monotonic() - started
+        analysis.mark_failed(str(e))
+        return analysis
+
+    analysis.execution_time = time.monotonic() - started
+    analysis.mark_completed()
+    return analysis
+
+
+# ============================================
+# WORKER POOL
+# ============================================
+
+class WorkerPool:
+    """A pool of threads that claim and process pending analyses."""
+
+    def __init__(self, workers=None, queue=None):
+        config = get_config()
+        self.workers = workers or config['WORKERS']
+        self.stale_after = config['STALE_AFTER']
+        self.queue = queue or get_queue()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        requeue_stale(self.stale_after)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'analysis-worker-{i}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def run_once(self):
+        """Claim and process one job. Returns False when nothing was claimed."""
+        close_old_connections()
+        for analysis_id in self.queue.candidates(self.stop_event):
+            if claim_analysis(analysis_id):
+                process_analysis(analysis_id, self._analyzer())
+                with self._lock:
+                    self.processed += 1
+                return True
+        return False
+
+    def drain(self):
+        """Process jobs until the queue is empty (used by ``--once``)."""
+        self.stop_event.set()  # never sleep between polls
+        while self.run_once():
+            pass
+
+    def _analyzer(self):
+        from .services import GeminiCodeAnalyzer
+
+        # One analyzer per worker thread, reused across jobs.
+        if not hasattr(self._local, 'analyzer'):
+            self._local.analyzer = GeminiCodeAnalyzer()
+        return self._local.analyzer
+
+    def _run(self):
+        last_sweep = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.run_once()
+                except Exception:
+                    logger.exception('Analysis worker error')
+                    self.stop_event.wait(1)
+                if time.monotonic() - last_sweep > self.stale_after:
+                    requeue_stale(self.stale_after)
+                    last_sweep = time.monotonic()
+        finally:
+            connection.close()
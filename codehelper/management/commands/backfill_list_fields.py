@@ -0,0 +1,42 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# Models with stored list projections, and the columns set_list_fields() fills
+MODELS = {
+    'codehelper.CodeAnalysis': ['lines_of_code', 'code_preview', 'code_size', 'result_summary'],
+    'codehelper.CodeSnippet': ['lines_of_code', 'code_preview', 'code_size'],
+    'content.BlogPost': ['summary', 'content_size', 'line_count', 'word_count'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Fill the preview/size/line-count columns of existing analyses, snippets and blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=sorted(MODELS),
+                            help='Only this model (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        for label in options['models'] or MODELS:
+            model = apps.get_model(label)
+            fields = MODELS[label]
+            count = 0
+            last_pk = 0
+            # Walk by primary key so each chunk is its own short transaction
+            while True:
+                rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+                if not rows:
+                    break
+                for row in rows:
+                    row.set_list_fields()
+                with transaction.atomic():
+                    model.objects.bulk_update(rows, fields)
+                count += len(rows)
+                last_pk = rows[-1].pk
+            self.stdout.write(self.style.SUCCESS(f'{label}: updated {count} rows'))
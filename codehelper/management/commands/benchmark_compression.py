@@ -0,0 +1,87 @@
+import json
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core import fields
+from core.fields import compress, decompress
+
+from .compress_text_fields import FIELDS
+
+SAMPLE_CODE = '''
+def fibonacci(n):
+    """Return the n-th Fibonacci number."""
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+class Cache:
+    def __init__(self):
+        self.items = {}
+
+    def get(self, key, default=None):
+        return self.items.get(key, default)
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure storage saved and CPU cost per read of compressed text columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=200, help='Rows sampled per column')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed reads per value')
+        parser.add_argument('--threshold', type=int, default=None,
+                            help='Override COMPRESSED_TEXT THRESHOLD for the run')
+
+    def handle(self, *args, **options):
+        samples = {}
+        for label, field in FIELDS.items():
+            model = apps.get_model(label)
+            values = [
+                getattr(row, field)
+                for row in model.objects.only('pk', field).order_by('-pk')[:options['sample']]
+            ]
+            if values:
+                samples[f'{label}.{field}'] = values
+        if not samples:
+            # Empty database: synthetic code of a few typical sizes
+            samples['synthetic'] = [SAMPLE_CODE * n for n in (1, 5, 20, 100)]
+
+        algorithms = [('zlib', 1), ('zlib', 6), ('zlib', 9)]
+        if fields.zstandard:
+            algorithms += [('zstd', 3), ('zstd', 10)]
+
+        results = []
+        for name, values in samples.items():
+            raw = sum(len(v.encode()) for v in values)
+            for algorithm, level in algorithms:
+                started = time.perf_counter()
+                stored = [
+                    compress(v, algorithm=algorithm, level=level, threshold=options['threshold'])
+                    for v in values
+                ]
+                write_time = time.perf_counter() - started
+
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    for s in stored:
+                        decompress(s)
+                read_time = (time.perf_counter() - started) / options['repeat']
+
+                size = sum(len(s.encode()) for s in stored)
+                results.append({
+                    'column': name,
+                    'algorithm': algorithm,
+                    'level': level,
+                    'rows': len(values),
+                    'raw_bytes': raw,
+                    'stored_bytes': size,
+                    'ratio': round(raw / size, 2) if size else None,
+                    'saved_bytes': raw - size,
+                    'compress_us_per_row': round(write_time / len(values) * 1e6, 1),
+                    'read_us_per_row': round(read_time / len(values) * 1e6, 1),
+                })
+        self.stdout.write(json.dumps(results, indent=2))
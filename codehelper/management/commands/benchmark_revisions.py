@@ -0,0 +1,144 @@
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from codehelper.models import CodeSnippet
+from codehelper.revisions import get_config, reconstruct
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _source(lines):
+    out = []
+    n = 0
+    while len(out) < lines:
+        out += [
+            f'def handler_{n}(request, item_id):\n',
+            f'    """Handle request {n}."""\n',
+            f'    item = load(item_id)\n',
+            f'    if item is None:\n',
+            f'        return not_found({n})\n',
+            f'    return render(item, extra={n})\n',
+            '\n',
+        ]
+        n += 1
+    return out[:lines]
+
+
+def _edit(lines, rng, n):
+    """One typical edit: change, insert or delete a line, or append a block."""
+    choice = rng.random()
+    i = rng.randrange(len(lines))
+    if choice < 0.6:
+        lines[i] = lines[i].rstrip('\n') + f'  # edit {n}\n'
+    elif choice < 0.8:
+        lines.insert(i, f'    log("step {n}")\n')
+    elif choice < 0.95 and len(lines) > 10:
+        del lines[i]
+    else:
+        lines += [f'def added_{n}():\n', f'    return {n}\n', '\n']
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class Command(BaseCommand):
+    help = 'Measure storage per revision and reconstruction latency of snippet revision history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--revisions', type=int, default=1000, help='Edits applied to the snippet')
+        parser.add_argument('--lines', type=int, default=300, help='Lines of code in the snippet')
+        parser.add_argument('--keyframe-interval', type=int, default=None,
+                            help='Override CODEHELPER_REVISIONS KEYFRAME_INTERVAL for the run')
+        parser.add_argument('--sample', type=int, default=200, help='Revisions reconstructed and timed')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        config = get_config()
+        if options['keyframe_interval']:
+            config['KEYFRAME_INTERVAL'] = options['keyframe_interval']
+        result = {}
+        # Everything is written inside a transaction that is rolled back
+        try:
+            with override_settings(CODEHELPER_REVISIONS=config), transaction.atomic():
+                result = self.run(options, config['KEYFRAME_INTERVAL'])
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(json.dumps(result, indent=2))
+
+    def run(self, options, interval):
+        rng = random.Random(options['seed'])
+        user = get_user_model().objects.create_user(
+            username=f'revision-benchmark-{time.time_ns()}', password=None
+        )
+        lines = _source(options['lines'])
+        snippet = CodeSnippet(user=user, title='Revision benchmark')
+        snippet.code = ''.join(lines)
+        snippet.save()
+
+        expected = {1: snippet.code}
+        save_times = []
+        for n in range(2, options['revisions'] + 1):
+            _edit(lines, rng, n)
+            snippet.code = ''.join(lines)
+            started = time.perf_counter()
+            snippet.save()
+            save_times.append(time.perf_counter() - started)
+            expected[n] = snippet.code
+
+        revisions = list(snippet.revisions.select_related('keyframe').order_by('number'))
+        keyframes = [r for r in revisions if r.is_keyframe]
+        deltas = [r for r in revisions if not r.is_keyframe]
+        full_bytes = sum(r.size for r in revisions)
+        keyframe_bytes = sum(r.keyframe.size for r in keyframes)
+        delta_bytes = sum(r.stored_size for r in deltas)
+
+        numbers = sorted(expected)
+        sample = rng.sample(numbers, min(options['sample'], len(numbers)))
+        # The slowest case: the revision just before the next keyframe
+        sample.append(max(k.number for k in keyframes) - 1 if len(keyframes) > 1 else numbers[-1])
+        read_times = []
+        for number in sample:
+            started = time.perf_counter()
+            code = reconstruct(snippet, number)
+            read_times.append(time.perf_counter() - started)
+            if code != expected[number]:
+                raise AssertionError(f'Revision {number} reconstructed incorrectly')
+        read_times.sort()
+
+        return {
+            'revisions': len(revisions),
+            'keyframe_interval': interval,
+            'code_bytes': len(snippet.code.encode()),
+            'storage': {
+                'full_copy_bytes': full_bytes,
+                'stored_bytes': keyframe_bytes + delta_bytes,
+                'ratio': round(full_bytes / (keyframe_bytes + delta_bytes), 1),
+                'keyframes': len(keyframes),
+                'keyframe_bytes': keyframe_bytes,
+                'deltas': len(deltas),
+                'delta_bytes': delta_bytes,
+                'bytes_per_revision': round((keyframe_bytes + delta_bytes) / len(revisions), 1),
+                'bytes_per_delta': round(delta_bytes / len(deltas), 1) if deltas else None,
+            },
+            'save_ms': {
+                'p50': _ms(statistics.median(save_times)) if save_times else None,
+                'max': _ms(max(save_times)) if save_times else None,
+            },
+            'reconstruct_ms': {
+                'samples': len(read_times),
+                'p50': _ms(read_times[len(read_times) // 2]),
+                'p95': _ms(read_times[int(len(read_times) * 0.95) - 1]),
+                'max': _ms(read_times[-1]),
+            },
+        }
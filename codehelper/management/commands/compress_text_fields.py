@@ -0,0 +1,66 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.fields import StoredText, compress
+
+# Every CompressedTextField in the project
+FIELDS = {
+    'codehelper.CodeBlob': 'code',
+    'codehelper.CodeAnalysis': 'result',
+    'content.BlogPost': 'content',
+}
+
+
+class Command(BaseCommand):
+    help = 'Compress large text values written before CompressedTextField existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=sorted(FIELDS),
+                            help='Only this model (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be compressed without writing')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        for label in options['models'] or FIELDS:
+            model = apps.get_model(label)
+            field = FIELDS[label]
+            scanned = converted = before = after = 0
+            last_pk = None
+
+            # Walk by primary key so each chunk is its own short transaction
+            while True:
+                rows = model.objects.order_by('pk').only('pk', field)
+                if last_pk is not None:
+                    rows = rows.filter(pk__gt=last_pk)
+                rows = list(rows[:batch_size])
+                if not rows:
+                    break
+                last_pk = rows[-1].pk
+                scanned += len(rows)
+
+                changed = []
+                for row in rows:
+                    stored = row.__dict__[field]
+                    if stored is None or isinstance(stored, StoredText):
+                        continue  # already compressed
+                    packed = compress(stored)
+                    if packed != stored:
+                        changed.append(row)
+                        before += len(stored.encode())
+                        after += len(packed.encode())
+                if changed and not options['dry_run']:
+                    with transaction.atomic():
+                        model.objects.bulk_update(changed, [field])
+                converted += len(changed)
+
+            verb = 'would compress' if options['dry_run'] else 'compressed'
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}.{field}: {verb} {converted} of {scanned} rows '
+                f'({before} -> {after} bytes)'
+            ))
@@ -0,0 +1,49 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import replica_reads
+from codehelper.export import FORMATS, KINDS, export, parse_kinds
+
+
+class Command(BaseCommand):
+    help = "Export a user's analyses, snippets and blog posts as NDJSON or a zip of source files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--types', default='',
+                            help=f"Comma-separated subset of {', '.join(KINDS)} (default: all)")
+        parser.add_argument('--no-compress', action='store_true', help='Write plain NDJSON instead of gzip')
+        parser.add_argument('--output', '-o', default=None,
+                            help="File to write (default: the export's own file name; '-' for stdout)")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+        try:
+            kinds = parse_kinds(options['types'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        with replica_reads():
+            chunks, _, filename = export(
+                user, format=options['format'], kinds=kinds, compress=not options['no_compress']
+            )
+            output = options['output'] or filename
+            size = 0
+            out = sys.stdout.buffer if output == '-' else open(output, 'wb')
+            try:
+                for chunk in chunks:
+                    out.write(chunk)
+                    size += len(chunk)
+            finally:
+                if out is not sys.stdout.buffer:
+                    out.close()
+
+        if output != '-':
+            self.stderr.write(self.style.SUCCESS(f'Wrote {size} bytes to {output}'))
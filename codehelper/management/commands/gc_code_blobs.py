@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from codehelper.models import CodeAnalysis, CodeBlob, CodeSnippet, SnippetRevision
+
+
+class Command(BaseCommand):
+    help = 'Delete code blobs no analysis, snippet or revision keyframe refers to any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        orphans = CodeBlob.objects.filter(
+            ~Exists(CodeAnalysis.objects.filter(blob=OuterRef('pk'))),
+            ~Exists(CodeSnippet.objects.filter(blob=OuterRef('pk'))),
+            ~Exists(SnippetRevision.objects.filter(keyframe=OuterRef('pk'))),
+        )
+        if options['dry_run']:
+            self.stdout.write(f'{orphans.count()} unreferenced blobs')
+            return
+        deleted, _ = orphans.delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} unreferenced blobs'))
@@ -0,0 +1,42 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from codehelper.importer import SnippetImportError, import_snippets
+from codehelper.models import CodeSnippet
+
+
+class Command(BaseCommand):
+    help = "Import snippets for a user from an NDJSON (optionally gzipped), zip or gist-style JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Snippets per bulk insert (default: CODEHELPER_IMPORT["BATCH_SIZE"])')
+        parser.add_argument('--visibility', default='private',
+                            choices=[value for value, _ in CodeSnippet.VISIBILITY_CHOICES],
+                            help='Visibility for records that do not set one')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+
+        try:
+            with open(options['path'], 'rb') as source:
+                report = import_snippets(
+                    user, source, os.path.basename(options['path']),
+                    default_visibility=options['visibility'], batch_size=options['batch_size'],
+                )
+        except (OSError, SnippetImportError) as e:
+            raise CommandError(str(e))
+
+        for ref, message in report.errors:
+            self.stderr.write(f'{ref}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.created} snippets ({report.skipped} skipped, {len(report.errors)} errors)'
+        ))
@@ -0,0 +1,38 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from codehelper.jobs import WorkerPool, get_config
+
+
+class Command(BaseCommand):
+    help = 'Run the background worker pool that processes pending code analyses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Number of worker threads (default: CODEHELPER_JOBS["WORKERS"])')
+        parser.add_argument('--once', action='store_true',
+                            help='Process every pending analysis and exit')
+
+    def handle(self, *args, **options):
+        pool = WorkerPool(workers=options['workers'])
+
+        if options['once']:
+            pool.drain()
+            self.stdout.write(self.style.SUCCESS(f'Processed {pool.processed} analyses'))
+            return
+
+        def shutdown(signum, frame):
+            pool.stop_event.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            f'Starting {pool.workers} analysis workers ({get_config()["BACKEND"]} queue)...'
+        )
+        pool.start()
+        while not pool.stop_event.wait(1):
+            pass
+        pool.stop()
+        self.stdout.write(self.style.SUCCESS(f'Stopped after {pool.processed} analyses'))
@@ -0,0 +1,163 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('code', models.TextField()),
+                ('analysis_type', models.CharField(choices=[('explain', '📖 Explain Code'), ('debug', '🐛 Debug Code'), ('optimize', '⚡ Optimize Code'), ('document', '📝 Add Documentation'), ('convert', '🔄 Convert Language'), ('review', '🔍 Code Review'), ('security', '🛡️ Security Check'), ('complexity', '📊 Complexity Analysis')], default='explain', max_length=20)),
+                ('result', models.TextField(blank=True)),
+                ('suggestions', models.JSONField(blank=True, default=list)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('complexity_score', models.FloatField(blank=True, null=True)),
+                ('security_score', models.FloatField(blank=True, null=True)),
+                ('tokens_used', models.IntegerField(default=40)),
+                ('execution_time', models.FloatField(blank=True, help_text='Time in seconds', null=True)),
+                ('lines_of_code', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', '⏳ Pending'), ('processing', '🔄 Processing'), ('completed', '✅ Completed'), ('failed', '❌ Failed')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProgrammingLanguage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('slug', models.SlugField(unique=True)),
+                ('icon', models.CharField(blank=True, help_text='Font Awesome icon class', max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('theme', models.CharField(choices=[('light', '☀️ Light'), ('dark', '🌙 Dark'), ('system', '💻 System')], default='dark', max_length=20)),
+                ('editor_mode', models.CharField(choices=[('default', 'Default'), ('vim', 'Vim'), ('emacs', 'Emacs')], default='default', max_length=20)),
+                ('font_size', models.IntegerField(default=14)),
+                ('tab_size', models.IntegerField(default=4)),
+                ('auto_complete', models.BooleanField(default=True)),
+                ('line_numbers', models.BooleanField(default=True)),
+                ('default_analysis', models.CharField(choices=[('explain', '📖 Explain Code'), ('debug', '🐛 Debug Code'), ('optimize', '⚡ Optimize Code'), ('document', '📝 Add Documentation'), ('convert', '🔄 Convert Language'), ('review', '🔍 Code Review'), ('security', '🛡️ Security Check'), ('complexity', '📊 Complexity Analysis')], default='explain', max_length=20)),
+                ('auto_save', models.BooleanField(default=True)),
+                ('email_notifications', models.BooleanField(default=True)),
+                ('analysis_completed', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('default_language', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='codehelper.programminglanguage')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='codehelper_preferences', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CodeReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_number', models.IntegerField(blank=True, null=True)),
+                ('comment', models.TextField()),
+                ('suggestion', models.TextField(blank=True)),
+                ('is_resolved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='codehelper.codeanalysis')),
+                ('reviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='code_reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['line_number', 'created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='language',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='codehelper.programminglanguage'),
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='target_language',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='conversion_targets', to='codehelper.programminglanguage'),
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='code_analyses', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='APIKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_used', models.DateTimeField(blank=True, null=True)),
+                ('requests_count', models.IntegerField(default=0)),
+                ('tokens_used', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='codehelper_api_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CodeSnippet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('code', models.TextField()),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('visibility', models.CharField(choices=[('private', '🔒 Private'), ('public', '🌍 Public'), ('shared', '🔗 Shared')], default='private', max_length=20)),
+                ('share_token', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('fork_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('analyses', models.ManyToManyField(blank=True, related_name='snippets', to='codehelper.codeanalysis')),
+                ('language', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='codehelper.programminglanguage')),
+                ('parent_snippet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='child_snippets', to='codehelper.codesnippet')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='code_snippets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='codehelper__user_id_3d986c_idx'), models.Index(fields=['visibility', '-created_at'], name='codehelper__visibil_edba39_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='codeanalysis',
+            index=models.Index(fields=['user', '-created_at'], name='codehelper__user_id_82a9f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeanalysis',
+            index=models.Index(fields=['status'], name='codehelper__status_6f507b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeanalysis',
+            index=models.Index(fields=['analysis_type'], name='codehelper__analysi_e77008_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from codehelper.search import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection.vendor).create(cursor)
+
+
+def drop_search_index(apps, schema_editor):
+    from codehelper.search import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection.vendor).drop(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def reset_like_counters(apps, schema_editor):
+    # Old likes were anonymous click counts with no SnippetLike rows behind
+    # them; start the counter cache from the (empty) relation.
+    CodeSnippet = apps.get_model('codehelper', 'CodeSnippet')
+    CodeSnippet.objects.exclude(likes=0).update(likes=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('codehelper', '0002_snippet_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnippetLike',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('snippet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snippet_likes', to='codehelper.codesnippet')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snippet_likes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'snippet')},
+            },
+        ),
+        migrations.RunPython(reset_like_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('codehelper', '0003_snippetlike'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('analysis_type', models.CharField(choices=[('explain', '📖 Explain Code'), ('debug', '🐛 Debug Code'), ('optimize', '⚡ Optimize Code'), ('document', '📝 Add Documentation'), ('convert', '🔄 Convert Language'), ('review', '🔍 Code Review'), ('security', '🛡️ Security Check'), ('complexity', '📊 Complexity Analysis')], default='explain', max_length=20)),
+                ('total_files', models.IntegerField(default=0)),
+                ('tokens_used', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', '⏳ Pending'), ('processing', '🔄 Processing'), ('completed', '✅ Completed'), ('failed', '❌ Failed')], default='processing', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Analysis batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analyses', to='codehelper.analysisbatch'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0004_analysisbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apikey',
+            name='rate_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Requests per minute; blank uses the plan limit', null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('codehelper', '0005_apikey_rate_limit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCodeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('analysis_count', models.IntegerField(default=0)),
+                ('snippet_count', models.IntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='codehelper_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
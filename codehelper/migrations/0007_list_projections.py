@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0006_usercodestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='code_preview',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='code_size',
+            field=models.PositiveIntegerField(default=0, help_text='Bytes'),
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='result_summary',
+            field=models.CharField(blank=True, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='codesnippet',
+            name='code_preview',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='codesnippet',
+            name='code_size',
+            field=models.PositiveIntegerField(default=0, help_text='Bytes'),
+        ),
+        migrations.AddField(
+            model_name='codesnippet',
+            name='lines_of_code',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+import hashlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_code_to_blobs(apps, schema_editor):
+    CodeBlob = apps.get_model('codehelper', 'CodeBlob')
+    for name in ('CodeAnalysis', 'CodeSnippet'):
+        model = apps.get_model('codehelper', name)
+        last_pk = 0
+        while True:
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'code')[:500])
+            if not rows:
+                break
+            blobs = {}
+            for row in rows:
+                encoded = row.code.encode()
+                row.blob_id = hashlib.sha256(encoded).hexdigest()
+                blobs[row.blob_id] = CodeBlob(hash=row.blob_id, code=row.code, size=len(encoded))
+            CodeBlob.objects.bulk_create(blobs.values(), ignore_conflicts=True)
+            model.objects.bulk_update(rows, ['blob'])
+            last_pk = rows[-1].pk
+
+
+def copy_code_back(apps, schema_editor):
+    for name in ('CodeAnalysis', 'CodeSnippet'):
+        model = apps.get_model('codehelper', name)
+        rows = list(model.objects.select_related('blob').iterator(chunk_size=500))
+        for row in rows:
+            row.code = row.blob.code
+        model.objects.bulk_update(rows, ['code'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0007_list_projections'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeBlob',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('code', models.TextField()),
+                ('size', models.PositiveIntegerField(default=0, help_text='Bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='codeanalysis',
+            name='blob',
+            field=models.ForeignKey(db_column='code_hash', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='analyses', to='codehelper.codeblob'),
+        ),
+        migrations.AddField(
+            model_name='codesnippet',
+            name='blob',
+            field=models.ForeignKey(db_column='code_hash', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='snippets', to='codehelper.codeblob'),
+        ),
+        migrations.AlterField(
+            model_name='codeanalysis',
+            name='code',
+            field=models.TextField(default=''),
+        ),
+        migrations.AlterField(
+            model_name='codesnippet',
+            name='code',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(move_code_to_blobs, copy_code_back),
+        migrations.RemoveField(
+            model_name='codeanalysis',
+            name='code',
+        ),
+        migrations.RemoveField(
+            model_name='codesnippet',
+            name='code',
+        ),
+        migrations.AlterField(
+            model_name='codeanalysis',
+            name='blob',
+            field=models.ForeignKey(db_column='code_hash', on_delete=django.db.models.deletion.PROTECT, related_name='analyses', to='codehelper.codeblob'),
+        ),
+        migrations.AlterField(
+            model_name='codesnippet',
+            name='blob',
+            field=models.ForeignKey(db_column='code_hash', on_delete=django.db.models.deletion.PROTECT, related_name='snippets', to='codehelper.codeblob'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:30
+
+import core.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0008_codeblob'),
+    ]
+
+    # Same text column; only the Python-side field changes. Existing rows are
+    # compressed later by manage.py compress_text_fields.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='codeanalysis',
+                    name='result',
+                    field=core.fields.CompressedTextField(blank=True),
+                ),
+                migrations.AlterField(
+                    model_name='codeblob',
+                    name='code',
+                    field=core.fields.CompressedTextField(),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+def fill_lineage(apps, schema_editor):
+    CodeSnippet = apps.get_model('codehelper', 'CodeSnippet')
+    parents = dict(
+        CodeSnippet.objects.exclude(parent_snippet=None).values_list('pk', 'parent_snippet_id')
+    )
+    lineages = {}
+
+    def lineage(pk):
+        if pk not in parents:
+            return ''
+        if pk not in lineages:
+            parent = parents[pk]
+            lineages[pk] = f"{lineage(parent) or '/'}{parent}/"
+        return lineages[pk]
+
+    rows = []
+    for pk in parents:
+        rows.append(CodeSnippet(pk=pk, lineage=lineage(pk)))
+    CodeSnippet.objects.bulk_update(rows, ['lineage'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0009_compressed_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codesnippet',
+            name='lineage',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=1000),
+        ),
+        migrations.RunPython(fill_lineage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:48
+
+import core.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('codehelper', '0010_snippet_lineage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnippetRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('delta', core.fields.CompressedTextField(blank=True)),
+                ('code_hash', models.CharField(help_text="Hash of this version's code", max_length=64)),
+                ('size', models.PositiveIntegerField(default=0, help_text='Bytes of code in this version')),
+                ('stored_size', models.PositiveIntegerField(default=0, help_text='Bytes of delta stored (0 for keyframes)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('keyframe', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='revisions', to='codehelper.codeblob')),
+                ('snippet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='codehelper.codesnippet')),
+            ],
+            options={
+                'ordering': ['-number'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='snippetrevision',
+            constraint=models.UniqueConstraint(fields=('snippet', 'number'), name='unique_snippet_revision'),
+        ),
+    ]
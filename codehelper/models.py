@@ -1,6 +1,23 @@
-from django.db import models
+import hashlib
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
+from django.utils.text import Truncator
+from core.fields import CompressedTextField
+
+from .counters import api_usage, view_counter
+
+
+def code_preview(code, lines=3, length=200):
+    """The first few non-blank lines of ``code``, for list pages"""
+    head = [line.rstrip() for line in (code or '').splitlines() if line.strip()][:lines]
+    return Truncator('\n'.join(head)).chars(length)
+
+
+def text_summary(text, length=300):
+    return Truncator(' '.join((text or '').split())).chars(length)
 
 class ProgrammingLanguage(models.Model):
     """Programming languages supported by CodeHelper"""
@@ -17,7 +34,66 @@ class ProgrammingLanguage(models.Model):
     def __str__(self):
         return self.name
 
-class CodeAnalysis(models.Model):
+class CodeBlob(models.Model):
+    """Each distinct code body, stored once and keyed by its SHA-256"""
+    
+    hash = models.CharField(max_length=64, primary_key=True)
+    code = CompressedTextField()
+    size = models.PositiveIntegerField(default=0, help_text="Bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.hash[:12]
+    
+    @staticmethod
+    def hash_code(code):
+        return hashlib.sha256(code.encode()).hexdigest()
+    
+    @classmethod
+    def store_many(cls, codes):
+        """Insert any of ``codes`` not stored yet (one INSERT, duplicates ignored)"""
+        blobs = {}
+        for code in codes:
+            encoded = code.encode()
+            blobs.setdefault(hashlib.sha256(encoded).hexdigest(), (code, len(encoded)))
+        cls.objects.bulk_create(
+            [cls(hash=h, code=code, size=size) for h, (code, size) in blobs.items()],
+            ignore_conflicts=True
+        )
+
+class BlobCodeMixin:
+    """``code`` lives in CodeBlob; the row only holds its hash (``blob_id``).
+    
+    Reading ``code`` loads the blob once (use select_related('blob') for
+    lists); assigning it just re-hashes, and save() stores the new blob.
+    """
+    
+    @property
+    def code(self):
+        if '_code' not in self.__dict__:
+            self.__dict__['_code'] = self.blob.code if self.blob_id else ''
+        return self.__dict__['_code']
+    
+    @code.setter
+    def code(self, value):
+        value = value or ''
+        self.__dict__.setdefault('_saved_blob_id', self.blob_id)
+        self.__dict__['_code'] = value
+        self.__dict__['_code_dirty'] = True
+        self.blob_id = CodeBlob.hash_code(value)
+        self._state.fields_cache.pop('blob', None)
+    
+    def store_code(self):
+        if self.__dict__.pop('_code_dirty', False):
+            CodeBlob.store_many([self.code])
+    
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_code', None)
+        self.__dict__.pop('_code_dirty', None)
+        self.__dict__.pop('_saved_blob_id', None)
+        super().refresh_from_db(*args, **kwargs)
+
+class CodeAnalysis(BlobCodeMixin, models.Model):
     """Main model for code analysis requests"""
     
     ANALYSIS_TYPES = [
@@ -45,7 +121,12 @@ class CodeAnalysis(models.Model):
     )
     
     title = models.CharField(max_length=200, blank=True)
-    code = models.TextField()
+    blob = models.ForeignKey(
+        CodeBlob,
+        on_delete=models.PROTECT,
+        db_column='code_hash',
+        related_name='analyses'
+    )
     language = models.ForeignKey(
         ProgrammingLanguage, 
         on_delete=models.SET_NULL,
@@ -65,7 +146,15 @@ class CodeAnalysis(models.Model):
         related_name='conversion_targets'
     )
     
-    result = models.TextField(blank=True)
+    batch = models.ForeignKey(
+        'AnalysisBatch',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='analyses'
+    )
+    
+    result = CompressedTextField(blank=True)
     suggestions = models.JSONField(default=list, blank=True)
     errors = models.JSONField(default=list, blank=True)
     complexity_score = models.FloatField(null=True, blank=True)
@@ -75,6 +164,11 @@ class CodeAnalysis(models.Model):
     execution_time = models.FloatField(null=True, blank=True, help_text="Time in seconds")
     lines_of_code = models.IntegerField(default=0)
     
+    # Filled on save so list pages never load code/result
+    code_preview = models.CharField(max_length=200, blank=True)
+    code_size = models.PositiveIntegerField(default=0, help_text="Bytes")
+    result_summary = models.CharField(max_length=300, blank=True)
+    
     status = models.CharField(
         max_length=20, 
         choices=STATUS_CHOICES,
@@ -96,14 +190,38 @@ class CodeAnalysis(models.Model):
     def __str__(self):
         return f"{self.get_analysis_type_display()} - {self.created_at}"
     
+    # Columns the history page reads; everything else stays on disk
+    LIST_FIELDS = [
+        'id', 'title', 'analysis_type', 'status', 'tokens_used', 'execution_time',
+        'lines_of_code', 'code_preview', 'code_size', 'result_summary',
+        'created_at', 'completed_at', 'language__name', 'language__slug', 'language__icon',
+    ]
+    
+    def set_list_fields(self):
+        self.lines_of_code = len(self.code.splitlines()) if self.code else 0
+        self.code_size = len((self.code or '').encode())
+        self.code_preview = code_preview(self.code)
+        self.result_summary = text_summary(self.result)
+    
     def save(self, *args, **kwargs):
-        if self.code:
-            self.lines_of_code = len(self.code.splitlines())
+        self.set_list_fields()
         if not self.title and self.code:
             preview = self.code[:50].strip()
             self.title = f"{self.get_analysis_type_display()} - {self.language} ({preview}...)"
+        self.store_code()
         super().save(*args, **kwargs)
     
+    def find_reusable_result(self):
+        """The result of an earlier completed analysis of the same code, if any"""
+        earlier = CodeAnalysis.objects.filter(
+            blob_id=self.blob_id,
+            language_id=self.language_id,
+            analysis_type=self.analysis_type,
+            target_language_id=self.target_language_id,
+            status='completed'
+        ).exclude(pk=self.pk).exclude(result='').order_by('-completed_at').only('result').first()
+        return earlier.result if earlier else None
+    
     def mark_completed(self):
         self.status = 'completed'
         self.completed_at = timezone.now()
@@ -116,7 +234,61 @@ class CodeAnalysis(models.Model):
         self.errors.append({'error': error_message, 'time': str(timezone.now())})
         self.save()
 
-class CodeSnippet(models.Model):
+class AnalysisBatch(models.Model):
+    """A multi-file submission; each file is a child CodeAnalysis"""
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='analysis_batches'
+    )
+    analysis_type = models.CharField(
+        max_length=20,
+        choices=CodeAnalysis.ANALYSIS_TYPES,
+        default='explain'
+    )
+    total_files = models.IntegerField(default=0)
+    tokens_used = models.IntegerField(default=0)
+    status = models.CharField(
+        max_length=20,
+        choices=CodeAnalysis.STATUS_CHOICES,
+        default='processing'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'Analysis batches'
+    
+    def __str__(self):
+        return f"Batch {self.id} - {self.total_files} files"
+    
+    def progress(self):
+        """Aggregate child status counts in one query"""
+        counts = {status: 0 for status, _ in CodeAnalysis.STATUS_CHOICES}
+        for row in self.analyses.values('status').annotate(n=models.Count('id')).order_by():
+            counts[row['status']] = row['n']
+        
+        done = counts['completed'] + counts['failed']
+        if done == self.total_files and not self.completed_at:
+            self.status = 'completed'
+            self.completed_at = timezone.now()
+            AnalysisBatch.objects.filter(pk=self.pk).update(
+                status=self.status, completed_at=self.completed_at
+            )
+        
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total_files,
+            'done': done,
+            'percent': round(100 * done / self.total_files) if self.total_files else 100,
+            'counts': counts,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+class CodeSnippet(BlobCodeMixin, models.Model):
     """Saved code snippets for future reference"""
     
     VISIBILITY_CHOICES = [
@@ -132,7 +304,12 @@ class CodeSnippet(models.Model):
     )
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
-    code = models.TextField()
+    blob = models.ForeignKey(
+        CodeBlob,
+        on_delete=models.PROTECT,
+        db_column='code_hash',
+        related_name='snippets'
+    )
     language = models.ForeignKey(ProgrammingLanguage, on_delete=models.SET_NULL, null=True)
     tags = models.JSONField(default=list, blank=True)
     visibility = models.CharField(
@@ -142,6 +319,11 @@ class CodeSnippet(models.Model):
     )
     share_token = models.CharField(max_length=100, unique=True, null=True, blank=True)
     
+    # Filled on save so list pages never load code
+    code_preview = models.CharField(max_length=200, blank=True)
+    code_size = models.PositiveIntegerField(default=0, help_text="Bytes")
+    lines_of_code = models.IntegerField(default=0)
+    
     # Stats
     views = models.IntegerField(default=0)
     likes = models.IntegerField(default=0)
@@ -157,6 +339,8 @@ class CodeSnippet(models.Model):
         blank=True,
         related_name='child_snippets'  # Changed from 'forks' to 'child_snippets'
     )
+    # Ancestor ids, root first: '' for an original, '/4/9/' for a fork of 9 (a fork of 4)
+    lineage = models.CharField(max_length=1000, blank=True, default='', db_index=True, editable=False)
     
     analyses = models.ManyToManyField(CodeAnalysis, blank=True, related_name='snippets')
     
@@ -170,12 +354,110 @@ class CodeSnippet(models.Model):
             models.Index(fields=['visibility', '-created_at']),
         ]
     
+    COUNTER_FIELDS = ['views', 'likes', 'fork_count']
+    
+    LIST_FIELDS = [
+        'id', 'title', 'tags', 'visibility', 'share_token', 'views', 'likes', 'fork_count',
+        'code_preview', 'code_size', 'lines_of_code', 'created_at', 'updated_at',
+        'language__name', 'language__slug', 'language__icon',
+    ]
+    
     def __str__(self):
         return self.title
     
+    def set_list_fields(self):
+        self.lines_of_code = len(self.code.splitlines()) if self.code else 0
+        self.code_size = len((self.code or '').encode())
+        self.code_preview = code_preview(self.code)
+    
+    def save(self, *args, **kwargs):
+        previous_blob_id = self.__dict__.pop('_saved_blob_id', None)
+        code_changed = self.__dict__.get('_code_dirty') and (
+            self._state.adding or self.blob_id != previous_blob_id
+        )
+        # The list fields only change with the code; a metadata edit (or a
+        # fork, which copies them) never has to load the blob
+        if self.__dict__.get('_code_dirty'):
+            self.set_list_fields()
+        self.store_code()
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            # Counters only change through F() updates and the view buffer; a
+            # full-row save from a stale instance must not write them back
+            skip = set(self.COUNTER_FIELDS) | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in skip and f.name not in skip
+            ]
+        if not code_changed:
+            super().save(*args, **kwargs)
+            return
+        from .revisions import record_revision
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            record_revision(self, previous_blob_id)
+    
+    # ---- forks -------------------------------------------------------------
+    
+    def fork(self, user):
+        """Create ``user``'s private copy of this snippet.
+        
+        The fork points at this snippet's CodeBlob, so no code is copied; the
+        first edit that changes the code gives it a blob of its own.
+        """
+        with transaction.atomic():
+            forked = CodeSnippet.objects.create(
+                user=user,
+                title=f"Fork: {self.title}"[:200],
+                description=self.description,
+                blob_id=self.blob_id,
+                language_id=self.language_id,
+                tags=self.tags,
+                visibility='private',
+                parent_snippet=self,
+                lineage=self.descendant_prefix,
+                code_preview=self.code_preview,
+                code_size=self.code_size,
+                lines_of_code=self.lines_of_code,
+            )
+            CodeSnippet.objects.filter(pk=self.pk).update(fork_count=F('fork_count') + 1)
+        return forked
+    
+    @property
+    def descendant_prefix(self):
+        """The ``lineage`` every fork below this snippet starts with"""
+        return f"{self.lineage or '/'}{self.pk}/"
+    
+    @property
+    def ancestor_ids(self):
+        return [int(pk) for pk in self.lineage.strip('/').split('/') if pk]
+    
+    @property
+    def root_id(self):
+        ancestors = self.ancestor_ids
+        return ancestors[0] if ancestors else self.pk
+    
+    def root(self):
+        """The original this fork tree grew from (the oldest surviving ancestor)"""
+        ancestors = self.ancestor_ids
+        if not ancestors:
+            return self
+        found = CodeSnippet.objects.in_bulk(ancestors)
+        return next((found[pk] for pk in ancestors if pk in found), self)
+    
+    def descendants(self):
+        """Forks of this snippet at any depth: one index range scan on ``lineage``"""
+        prefix = self.descendant_prefix
+        # Everything starting with '/4/' sorts between '/4/' and '/40' ('0' follows '/')
+        return CodeSnippet.objects.filter(lineage__gte=prefix, lineage__lt=prefix[:-1] + '0')
+    
     def increment_views(self):
-        self.views += 1
-        self.save()
+        """Count a view; buffered and flushed in batches by codehelper/counters.py"""
+        view_counter.increment(self.pk)
+    
+    @property
+    def total_views(self):
+        """Stored views plus this process's not-yet-flushed increments"""
+        return self.views + view_counter.pending(self.pk)
     
     def generate_share_token(self):
         import uuid
@@ -184,6 +466,93 @@ class CodeSnippet(models.Model):
         self.save()
         return self.share_token
 
+class SnippetRevision(models.Model):
+    """One version of a snippet's code; see codehelper/revisions.py
+    
+    A keyframe points at the CodeBlob holding the full text; every other
+    revision stores a line delta against the revision before it.
+    """
+    
+    snippet = models.ForeignKey(CodeSnippet, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    keyframe = models.ForeignKey(
+        CodeBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='revisions'
+    )
+    delta = CompressedTextField(blank=True)
+    code_hash = models.CharField(max_length=64, help_text="Hash of this version's code")
+    size = models.PositiveIntegerField(default=0, help_text="Bytes of code in this version")
+    stored_size = models.PositiveIntegerField(default=0, help_text="Bytes of delta stored (0 for keyframes)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-number']
+        constraints = [
+            models.UniqueConstraint(fields=['snippet', 'number'], name='unique_snippet_revision'),
+        ]
+    
+    def __str__(self):
+        return f"{self.snippet_id} r{self.number}"
+    
+    @property
+    def is_keyframe(self):
+        return self.keyframe_id is not None
+
+class SnippetLike(models.Model):
+    """One user's like of a snippet; CodeSnippet.likes is its counter cache"""
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='snippet_likes'
+    )
+    snippet = models.ForeignKey(
+        CodeSnippet,
+        on_delete=models.CASCADE,
+        related_name='snippet_likes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = [('user', 'snippet')]
+    
+    def __str__(self):
+        return f"{self.user} likes {self.snippet}"
+    
+    @classmethod
+    def toggle(cls, user, snippet):
+        """Like or unlike. Returns (liked, likes) with the fresh counter value"""
+        with transaction.atomic():
+            deleted, _ = cls.objects.filter(user=user, snippet=snippet).delete()
+            if deleted:
+                liked = False
+                CodeSnippet.objects.filter(pk=snippet.pk).update(likes=F('likes') - 1)
+            else:
+                liked = True
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(user=user, snippet=snippet)
+                except IntegrityError:
+                    pass  # a concurrent click already liked it
+                else:
+                    CodeSnippet.objects.filter(pk=snippet.pk).update(likes=F('likes') + 1)
+            likes = CodeSnippet.objects.filter(pk=snippet.pk).values_list('likes', flat=True).get()
+        snippet.likes = likes
+        return liked, likes
+    
+    @classmethod
+    def liked_ids(cls, user, snippets):
+        """Which of ``snippets`` (objects or ids) has ``user`` liked - one query"""
+        if not user.is_authenticated:
+            return set()
+        ids = [getattr(s, 'pk', s) for s in snippets]
+        return set(
+            cls.objects.filter(user=user, snippet_id__in=ids).values_list('snippet_id', flat=True)
+        )
+
 class CodeReview(models.Model):
     """Code review comments and feedback"""
     
@@ -260,6 +629,45 @@ class UserPreference(models.Model):
     def __str__(self):
         return f"Preferences for {self.user.username}"
 
+class UserCodeStats(models.Model):
+    """Per-user row counts so list pages never run COUNT(*)"""
+    
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='codehelper_stats'
+    )
+    analysis_count = models.IntegerField(default=0)
+    snippet_count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"Stats for {self.user}"
+    
+    @classmethod
+    def bump(cls, user_id, **deltas):
+        """Add ``deltas`` (e.g. ``analysis_count=3``) to the user's counters"""
+        increments = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if increments and not cls.objects.filter(user_id=user_id).update(**increments):
+            cls._create(user_id)
+    
+    @classmethod
+    def for_user(cls, user):
+        return cls.objects.filter(user=user).first() or cls._create(user.pk)
+    
+    @classmethod
+    def _create(cls, user_id):
+        """First use: seed the counters from one real count"""
+        try:
+            with transaction.atomic():
+                return cls.objects.create(
+                    user_id=user_id,
+                    analysis_count=CodeAnalysis.objects.filter(user_id=user_id).count(),
+                    snippet_count=CodeSnippet.objects.filter(user_id=user_id).count()
+                )
+        except IntegrityError:
+            # Created concurrently; that request did the counting
+            return cls.objects.get(user_id=user_id)
+
 class APIKey(models.Model):
     """API keys for programmatic access"""
     
@@ -274,6 +682,11 @@ class APIKey(models.Model):
     last_used = models.DateTimeField(null=True, blank=True)
     requests_count = models.IntegerField(default=0)
     tokens_used = models.IntegerField(default=0)
+    rate_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text='Requests per minute; blank uses the plan limit'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(null=True, blank=True)
     
@@ -289,8 +702,6 @@ class APIKey(models.Model):
         self.save()
         return self.key
     
-    def increment_usage(self, tokens=0):
-        self.requests_count += 1
-        self.tokens_used += tokens
-        self.last_used = timezone.now()
-        self.save()
\ No newline at end of file
+    def increment_usage(self, tokens=0, requests=1):
+        # Buffered; flushed in batches by codehelper.counters.api_usage
+        api_usage.increment(self.pk, requests_count=requests, tokens_used=tokens)
\ No newline at end of file
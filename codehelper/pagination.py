@@ -0,0 +1,103 @@
+"""
+Keyset (seek) pagination for the newest-first list pages.
+
+``Paginator`` pages with ``COUNT(*)`` plus ``OFFSET``, so every page scans the
+user's rows up to the page it shows. ``KeysetPaginator`` instead remembers the
+``(created_at, id)`` of the row at the edge of the page in an opaque cursor and
+asks for rows strictly before (or after) it, which is a seek on the
+``(user, -created_at)`` index whatever the page depth. There is no page count;
+templates use ``has_next``/``next_cursor`` and ``has_previous``/``previous_cursor``.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(direction, created_at, pk):
+    raw = f'{direction}|{created_at.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(direction, created_at, pk)`` or None for a bad cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, created_at, pk = raw.split('|')
+        if direction not in ('n', 'p'):
+            return None
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            last = self.object_list[-1]
+            return encode_cursor('n', last.created_at, last.pk)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            first = self.object_list[0]
+            return encode_cursor('p', first.created_at, first.pk)
+        return None
+
+
+class KeysetPaginator:
+    """Pages ``queryset`` newest first by ``(created_at, id)``."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        """The page after/before ``cursor``; the first page if it is missing or bad."""
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            rows = list(self.queryset.order_by('-created_at', '-id')[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, False)
+
+        direction, created_at, pk = position
+        if direction == 'n':
+            rows = list(
+                self.queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by('-created_at', '-id')[:self.per_page + 1]
+            )
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, True)
+
+        rows = list(
+            self.queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by('created_at', 'id')[:self.per_page + 1]
+        )
+        more = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page][::-1], True, more)
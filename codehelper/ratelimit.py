@@ -0,0 +1,208 @@
+"""
+Per-APIKey rate limiting.
+
+Each key owns a token bucket: it holds up to ``BURST`` request tokens and
+refills at ``RATE`` tokens per minute. A request takes one token (or ``cost``
+tokens) and is rejected with ``429 Too Many Requests`` and a ``Retry-After``
+header when the bucket is empty. Limits come from the key owner's
+``subscription_plan`` in ``API_RATE_LIMIT['PLANS']``; a key with its own
+``rate_limit`` overrides the plan rate.
+
+Backends:
+
+* ``local`` - buckets in process memory. Fine for one process; with several
+  workers each process enforces the limit separately.
+* ``redis`` - buckets in Redis, updated by a Lua script so the refill and the
+  take are one atomic step shared by every process.
+
+Usage (request and token counts, ``last_used``) goes through the buffered
+``api_usage`` counter, so an API hit costs no database write of its own.
+"""
+import math
+import os
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .counters import api_usage
+
+DEFAULTS = {
+    'BACKEND': 'local',
+    'REDIS_URL': 'redis://localhost:6379/0',
+    'KEY_PREFIX': 'codehelper:ratelimit',
+    'PLANS': {
+        'free': {'RATE': 20, 'BURST': 10},
+        'basic': {'RATE': 60, 'BURST': 30},
+        'pro': {'RATE': 300, 'BURST': 100},
+        'enterprise': {'RATE': 1200, 'BURST': 400},
+    },
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'API_RATE_LIMIT', {}))
+    return config
+
+
+def get_limits(api_key):
+    """Return ``(rate_per_second, burst)`` for ``api_key``."""
+    plans = get_config()['PLANS']
+    plan = plans.get(api_key.user.subscription_plan, plans['free'])
+    rate = api_key.rate_limit or plan['RATE']
+    return rate / 60.0, max(plan['BURST'], 1)
+
+
+def refill(tokens, updated, rate, burst, now):
+    return min(burst, tokens + (now - updated) * rate)
+
+
+class LocalBackend:
+    """Token buckets in a per-process dict."""
+
+    def __init__(self, config):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key, rate, burst, cost=1):
+        """Take ``cost`` tokens. Returns ``(allowed, retry_after, remaining)``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = refill(tokens, updated, rate, burst, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+        retry_after = 0 if allowed else (cost - tokens) / rate
+        return allowed, retry_after, int(tokens)
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class RedisBackend:
+    """Token buckets in Redis hashes, shared by every process."""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, config):
+        import redis
+
+        self.prefix = config['KEY_PREFIX']
+        self.client = redis.Redis.from_url(config['REDIS_URL'])
+        self.script = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, cost=1):
+        allowed, tokens = self.script(
+            keys=[f'{self.prefix}:{key}'], args=[rate, burst, cost, time.time()]
+        )
+        tokens = float(tokens)
+        allowed = bool(int(allowed))
+        retry_after = 0 if allowed else (cost - tokens) / rate
+        return allowed, retry_after, int(tokens)
+
+    def reset(self, key):
+        self.client.delete(f'{self.prefix}:{key}')
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'redis': RedisBackend,
+}
+
+_backend = None
+_backend_pid = None
+
+
+def get_backend():
+    """Return the configured backend, rebuilt after a fork."""
+    global _backend, _backend_pid
+    if _backend is None or _backend_pid != os.getpid():
+        config = get_config()
+        _backend = BACKENDS[config['BACKEND']](config)
+        _backend_pid = os.getpid()
+    return _backend
+
+
+def check(api_key, cost=1):
+    """Charge ``cost`` requests to ``api_key``'s bucket.
+
+    Returns ``(allowed, retry_after_seconds, remaining)``.
+    """
+    rate, burst = get_limits(api_key)
+    return get_backend().take(api_key.pk, rate, burst, cost)
+
+
+def too_many_requests(retry_after):
+    response = JsonResponse(
+        {'error': 'Rate limit exceeded. Please slow down.'}, status=429
+    )
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def key_from_request(request):
+    """The raw key from ``X-API-Key`` or ``Authorization: Api-Key <key>``."""
+    key = request.headers.get('X-API-Key')
+    if not key:
+        scheme, _, value = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'api-key':
+            key = value.strip()
+    return key or None
+
+
+def get_api_key(key):
+    """Return the active, unexpired APIKey for ``key`` or None."""
+    from .models import APIKey
+
+    api_key = APIKey.objects.select_related('user').filter(key=key, is_active=True).first()
+    if api_key is None or not api_key.user.is_active:
+        return None
+    if api_key.expires_at and api_key.expires_at <= timezone.now():
+        return None
+    return api_key
+
+
+def api_key_required(view_func):
+    """Authenticate a view by API key and enforce the key's rate limit."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = key_from_request(request)
+        api_key = get_api_key(key) if key else None
+        if api_key is None:
+            return JsonResponse({'error': 'Invalid or missing API key'}, status=401)
+
+        allowed, retry_after, remaining = check(api_key)
+        if not allowed:
+            return too_many_requests(retry_after)
+
+        request.user = api_key.user
+        request.api_key = api_key
+        response = view_func(request, *args, **kwargs)
+        api_key.increment_usage()
+        response['X-RateLimit-Remaining'] = str(remaining)
+        return response
+    return wrapper
@@ -0,0 +1,9 @@
+from core.refdata import ReferenceData
+
+from .models import ProgrammingLanguage
+
+active_languages = ReferenceData(
+    'active_languages',
+    lambda: ProgrammingLanguage.objects.filter(is_active=True),
+    [ProgrammingLanguage]
+)
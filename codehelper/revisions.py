@@ -0,0 +1,160 @@
+"""
+Snippet revision history.
+
+Every save that changes a snippet's code appends a SnippetRevision:
+
+* a *keyframe* - a reference to the CodeBlob holding the full text. Blobs are
+  content-addressed, so the keyframe for the version the snippet currently
+  shows costs nothing but the reference; it only keeps that blob alive after
+  the snippet moves on.
+* a *delta* - the line-level difference from the previous revision, stored as
+  JSON: ``[a, b]`` copies lines ``a:b`` of the previous version, a list of
+  strings inserts those lines. Unchanged lines cost a few bytes per run.
+
+Revision 1 is always a keyframe, and so is every ``KEYFRAME_INTERVAL``-th
+revision after it (or any revision whose delta would be larger than the
+text). Reconstructing a version therefore reads one keyframe and at most
+``KEYFRAME_INTERVAL - 1`` deltas, in two queries.
+
+Snippets that existed before revisions were kept get their pre-edit code as
+revision 1 on their first edit.
+"""
+import difflib
+import json
+
+from django.conf import settings
+
+from .models import CodeBlob, CodeSnippet, SnippetRevision
+
+DEFAULTS = {
+    'KEYFRAME_INTERVAL': 50,
+}
+
+
+class RevisionNotFound(Exception):
+    pass
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CODEHELPER_REVISIONS', {}))
+    return config
+
+
+# ============================================
+# DELTAS
+# ============================================
+
+def make_delta(old, new):
+    """The ops turning ``old`` into ``new``, as compact JSON."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(new_lines[j1:j2])
+        # 'delete': the old lines are simply not copied
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    out = []
+    for op in json.loads(delta):
+        if op and isinstance(op[0], int):
+            out.extend(old_lines[op[0]:op[1]])
+        else:
+            out.extend(op)
+    return ''.join(out)
+
+
+# ============================================
+# WRITING
+# ============================================
+
+def record_revision(snippet, previous_blob_id=None):
+    """Append a revision for the code ``snippet`` was just saved with.
+
+    ``previous_blob_id`` is the blob the snippet pointed at before this save;
+    it seeds the history of a snippet that has none yet.
+    """
+    interval = get_config()['KEYFRAME_INTERVAL']
+    code = snippet.code
+    # Serialise concurrent edits of one snippet (a no-op on SQLite, which
+    # already allows one writer at a time)
+    list(CodeSnippet.objects.select_for_update().filter(pk=snippet.pk).values_list('pk'))
+
+    last = snippet.revisions.only('number', 'code_hash').order_by('-number').first()
+    if last is None and previous_blob_id and previous_blob_id != snippet.blob_id:
+        previous = CodeBlob.objects.filter(pk=previous_blob_id).only('hash', 'size').first()
+        if previous is not None:
+            last = SnippetRevision.objects.create(
+                snippet=snippet, number=1, keyframe=previous,
+                code_hash=previous.hash, size=previous.size,
+            )
+    if last is not None and last.code_hash == snippet.blob_id:
+        return last
+
+    number = last.number + 1 if last else 1
+    size = len(code.encode())
+    revision = SnippetRevision(snippet=snippet, number=number, code_hash=snippet.blob_id, size=size)
+    if last is not None and (number - 1) % interval:
+        # The previous version is normally still in the blob store
+        previous = CodeBlob.objects.filter(pk=last.code_hash).only('code').first()
+        old = previous.code if previous is not None else reconstruct(snippet, last.number)
+        delta = make_delta(old, code)
+        if len(delta.encode()) < size:
+            revision.delta = delta
+            revision.stored_size = len(delta.encode())
+    if not revision.delta:
+        revision.keyframe_id = snippet.blob_id
+    revision.save()
+    return revision
+
+
+# ============================================
+# READING
+# ============================================
+
+def reconstruct(snippet, number):
+    """The code of revision ``number`` of ``snippet``."""
+    keyframe = (
+        SnippetRevision.objects.filter(snippet=snippet, number__lte=number, keyframe__isnull=False)
+        .select_related('keyframe').order_by('-number').first()
+    )
+    if keyframe is None:
+        raise RevisionNotFound(f'Snippet {snippet.pk} has no revision {number}')
+    deltas = list(
+        SnippetRevision.objects.filter(snippet=snippet, number__gt=keyframe.number, number__lte=number)
+        .order_by('number').only('number', 'delta')
+    )
+    if len(deltas) != number - keyframe.number:
+        raise RevisionNotFound(f'Snippet {snippet.pk} has no revision {number}')
+
+    code = keyframe.keyframe.code
+    for revision in deltas:
+        code = apply_delta(code, revision.delta)
+    return code
+
+
+def list_revisions(snippet):
+    return snippet.revisions.only(
+        'number', 'keyframe', 'code_hash', 'size', 'stored_size', 'created_at'
+    ).order_by('-number')
+
+
+def diff(snippet, from_number, to_number, context=3):
+    """A unified diff between two revisions of ``snippet``."""
+    old = reconstruct(snippet, from_number)
+    new = reconstruct(snippet, to_number)
+    return ''.join(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile=f'r{from_number}',
+        tofile=f'r{to_number}',
+        n=context,
+    ))
+
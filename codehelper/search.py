@@ -0,0 +1,209 @@
+"""
+Full-text search over code snippets.
+
+``search_snippets(queryset, query)`` narrows a CodeSnippet queryset to the rows
+matching ``query`` and orders them by relevance. Title matches weigh more than
+description matches, which weigh more than tags and code. The index lives next
+to the snippet table and is kept in sync by the save/delete signals in
+``codehelper/signals.py``. ``python manage.py reindex_snippets`` rebuilds it.
+
+Backends, chosen from the database vendor:
+
+* SQLite     - an FTS5 virtual table keyed by snippet id, ranked with bm25()
+* PostgreSQL - a tsvector table with a GIN index, ranked with ts_rank()
+* others     - the old icontains filter, unranked
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'codehelper_snippet_search'
+
+
+def index_code():
+    return getattr(settings, 'CODEHELPER_SEARCH', {}).get('INDEX_CODE', True)
+
+
+def document(snippet):
+    """The searchable columns of a snippet, in weight order."""
+    return [
+        snippet.title or '',
+        snippet.description or '',
+        ' '.join(str(tag) for tag in snippet.tags or []),
+        (snippet.code or '') if index_code() else '',
+    ]
+
+
+class LikeBackend:
+    """No full-text support: plain substring matching."""
+
+    def create(self, cursor):
+        pass
+
+    def drop(self, cursor):
+        pass
+
+    def index(self, snippets):
+        pass
+
+    def remove(self, snippet_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(tags__icontains=query)
+        )
+
+
+class SQLiteBackend(LikeBackend):
+    WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+            f"USING fts5(title, description, tags, code, tokenize='unicode61')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, snippets):
+        rows = [(s.pk, *document(s)) for s in snippets]
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, title, description, tags, code) VALUES (%s, %s, %s, %s, %s)",
+                rows
+            )
+
+    def remove(self, snippet_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(pk,) for pk in snippet_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+
+    @staticmethod
+    def match_expression(query):
+        # Quote every word so user input can never be parsed as FTS syntax;
+        # the trailing * makes each word a prefix match.
+        return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [match])
+        ).annotate(
+            rank=RawSQL(
+                f"SELECT bm25({TABLE}, {weights}) FROM {TABLE} "
+                f"WHERE {TABLE} MATCH %s AND rowid = {table}.id",
+                [match]
+            )
+        ).order_by('rank', '-created_at')
+
+
+class PostgresBackend(LikeBackend):
+    VECTOR = (
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B') || "
+        "setweight(to_tsvector('english', %s), 'C') || "
+        "setweight(to_tsvector('english', %s), 'D')"
+    )
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            f"snippet_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document ON {TABLE} USING GIN (document)")
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, snippets):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (snippet_id, document) VALUES (%s, {self.VECTOR}) "
+                f"ON CONFLICT (snippet_id) DO UPDATE SET document = EXCLUDED.document",
+                [(s.pk, *document(s)) for s in snippets]
+            )
+
+    def remove(self, snippet_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE snippet_id = ANY(%s)", [list(snippet_ids)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {TABLE}")
+
+    def search(self, queryset, query):
+        table = queryset.model._meta.db_table
+        tsquery = "websearch_to_tsquery('english', %s)"
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT snippet_id FROM {TABLE} WHERE document @@ {tsquery}", [query])
+        ).annotate(
+            rank=RawSQL(
+                f"SELECT ts_rank(document, {tsquery}) FROM {TABLE} WHERE snippet_id = {table}.id",
+                [query]
+            )
+        ).order_by('-rank', '-created_at')
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend(vendor=None):
+    return BACKENDS.get(vendor or connection.vendor, LikeBackend)()
+
+
+def index_snippets(snippets):
+    snippets = list(snippets)
+    if snippets:
+        get_backend().index(snippets)
+
+
+def remove_snippets(snippet_ids):
+    snippet_ids = list(snippet_ids)
+    if snippet_ids:
+        get_backend().remove(snippet_ids)
+
+
+def search_snippets(queryset, query):
+    """Filter ``queryset`` to snippets matching ``query``, best match first."""
+    return get_backend().search(queryset, query)
+
+
+def rebuild_index(batch_size=500):
+    """Re-index every snippet. Returns the number indexed."""
+    from .models import CodeSnippet
+
+    backend = get_backend()
+    backend.clear()
+    batch = []
+    count = 0
+    for snippet in CodeSnippet.objects.select_related('blob').order_by().iterator(chunk_size=batch_size):
+        batch.append(snippet)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        backend.index(batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,64 @@
+from llm.cache import get_response_cache
+from llm.clients import get_client
+
+
+class GeminiCodeAnalyzer:
+    MODEL_NAME = 'gemini-pro'
+
+    PROMPTS = {
+        'explain': "Explain what this {language} code does, step by step.",
+        'debug': "Find bugs in this {language} code and show how to fix them.",
+        'optimize': "Suggest performance optimizations for this {language} code.",
+        'document': "Add clear docstrings and comments to this {language} code.",
+        'convert': "Convert this {language} code to {target_language}.",
+        'review': "Do a thorough code review of this {language} code.",
+        'security': "Check this {language} code for security vulnerabilities.",
+        'complexity': "Analyze the time and space complexity of this {language} code.",
+    }
+
+    def __init__(self):
+        self.client = get_client(self.MODEL_NAME)
+
+    @classmethod
+    def build_prompt(cls, code, language, analysis_type, target_language=None):
+        instruction = cls.PROMPTS.get(analysis_type, cls.PROMPTS['explain']).format(
+            language=language or 'source',
+            target_language=target_language or 'another language',
+        )
+        return f"""
+        {instruction}
+
+        Requirements:
+        - Write in markdown format
+        - Reference line numbers where relevant
+        - Keep the answer focused and practical
+
+        Code:
+        ```
+        {code}
+        ```
+        """
+
+    @classmethod
+    def cached_result(cls, code, language, analysis_type, target_language=None):
+        """Return a cached result for an identical earlier submission, if any."""
+        prompt = cls.build_prompt(code, language, analysis_type, target_language)
+        return get_response_cache('codehelper').get(prompt, cls.MODEL_NAME)
+
+    @classmethod
+    def known_result(cls, analysis):
+        """An earlier identical analysis' result, else a cached model answer."""
+        return analysis.find_reusable_result() or cls.cached_result(
+            analysis.code,
+            analysis.language.name if analysis.language else None,
+            analysis.analysis_type,
+            analysis.target_language.name if analysis.target_language else None,
+        )
+
+    def analyze(self, code, language, analysis_type, target_language=None):
+        """Run one analysis. Errors propagate so the job can be marked failed."""
+        prompt = self.build_prompt(code, language, analysis_type, target_language)
+        return get_response_cache('codehelper').get_or_generate(
+            prompt, self.MODEL_NAME,
+            lambda: self.client.generate(prompt),
+        )
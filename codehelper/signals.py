@@ -0,0 +1,41 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CodeAnalysis, CodeSnippet, UserCodeStats
+from .search import index_snippets, remove_snippets
+
+
+SEARCH_FIELDS = {'title', 'description', 'tags', 'blob'}
+
+
+@receiver(post_save, sender=CodeSnippet)
+def index_snippet(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the full-text index in step with snippet edits"""
+    if raw or (update_fields and not SEARCH_FIELDS & set(update_fields)):
+        return
+    index_snippets([instance])
+
+
+@receiver(post_delete, sender=CodeSnippet)
+def unindex_snippet(sender, instance, **kwargs):
+    remove_snippets([instance.pk])
+
+
+COUNTERS = {CodeAnalysis: 'analysis_count', CodeSnippet: 'snippet_count'}
+
+
+@receiver(post_save, sender=CodeAnalysis)
+@receiver(post_save, sender=CodeSnippet)
+def count_created(sender, instance, created=False, raw=False, **kwargs):
+    """Keep UserCodeStats in step; bulk_create callers bump it themselves"""
+    if created and not raw:
+        UserCodeStats.bump(instance.user_id, **{COUNTERS[sender]: 1})
+
+
+@receiver(post_delete, sender=CodeAnalysis)
+@receiver(post_delete, sender=CodeSnippet)
+def count_deleted(sender, instance, **kwargs):
+    # Update only: when the user itself is being deleted there is nothing to fix
+    field = COUNTERS[sender]
+    UserCodeStats.objects.filter(user_id=instance.user_id).update(**{field: F(field) - 1})
@@ -7,13 +7,17 @@ urlpatterns = [
     
     # Analysis
     path('analyze/', views.analyze_code, name='analyze_code'),
+    path('analyze/batch/', views.analyze_batch, name='analyze_batch'),
+    path('batch/<int:batch_id>/status/', views.batch_status, name='batch_status'),
     path('history/', views.analysis_history, name='analysis_history'),  # ✅ YEH URL ADD KARO
     path('view/<int:analysis_id>/', views.view_analysis, name='view_analysis'),
+    path('status/<int:analysis_id>/', views.analysis_status, name='analysis_status'),
     path('delete/<int:analysis_id>/', views.delete_analysis, name='delete_analysis'),
     
     # Snippets
     path('snippets/', views.snippet_list, name='snippet_list'),
     path('snippets/create/', views.create_snippet, name='create_snippet'),
+    path('snippets/import/', views.import_snippets, name='import_snippets'),
     path('snippets/<int:snippet_id>/', views.view_snippet, name='view_snippet'),
     path('snippets/<int:snippet_id>/edit/', views.edit_snippet, name='edit_snippet'),
     path('snippets/<int:snippet_id>/delete/', views.delete_snippet, name='delete_snippet'),
@@ -25,8 +29,13 @@ urlpatterns = [
     # API
     path('api/snippet/<int:snippet_id>/json/', views.get_snippet_json, name='get_snippet_json'),
     path('api/snippet/<int:snippet_id>/like/', views.toggle_snippet_like, name='toggle_snippet_like'),
+    path('api/snippet/<int:snippet_id>/forks/', views.snippet_forks, name='snippet_forks'),
+    path('api/snippet/<int:snippet_id>/revisions/', views.snippet_revisions, name='snippet_revisions'),
+    path('api/snippet/<int:snippet_id>/revisions/diff/', views.snippet_revision_diff, name='snippet_revision_diff'),
+    path('api/snippet/<int:snippet_id>/revisions/<int:number>/', views.snippet_revision, name='snippet_revision'),
     
     # Export
     path('export/analysis/<int:analysis_id>/', views.export_analysis, name='export_analysis'),
     path('export/snippet/<int:snippet_id>/', views.export_snippet, name='export_snippet'),
+    path('export/all/', views.export_all, name='export_all'),
 ]
\ No newline at end of file
@@ -3,10 +3,26 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
 from django.views.generic import TemplateView
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
-from .models import CodeAnalysis, ProgrammingLanguage, CodeSnippet, UserPreference
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+from core import pagecache
+from core.db import read_only_view
+from .models import (
+    AnalysisBatch, CodeAnalysis, ProgrammingLanguage, CodeSnippet, SnippetLike, UserCodeStats, UserPreference
+)
+from .batch import BatchError, create_batch, read_uploads
+from .counters import view_counter
+from .export import export, parse_kinds
+from .importer import SnippetImportError, import_snippets as run_import
+from .jobs import enqueue_analysis
+from .pagination import KeysetPaginator
+from .revisions import RevisionNotFound, diff as diff_revisions, list_revisions, reconstruct
+from .refdata import active_languages
+from .search import search_snippets
+from .services import GeminiCodeAnalyzer
 import json
 
 # ============================================
@@ -19,7 +35,7 @@ class CodeAnalyzerView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['languages'] = ProgrammingLanguage.objects.filter(is_active=True)
+        context['languages'] = active_languages.all()
         
         # Get user preferences if authenticated
         if self.request.user.is_authenticated:
@@ -68,16 +84,66 @@ def analyze_code(request):
             language=language,
             analysis_type=analysis_type,
             tokens_used=token_cost,
-            status='completed',
-            result=f"✅ Analysis complete! Your {language.name} code has been analyzed successfully."
+            status='pending'
         )
         
-        messages.success(request, f'✅ {analysis.get_analysis_type_display()} completed!')
+        # Identical (code, language, analysis_type) seen before - reuse it
+        cached = GeminiCodeAnalyzer.known_result(analysis)
+        if cached:
+            analysis.result = cached
+            analysis.execution_time = 0
+            analysis.mark_completed()
+            messages.success(request, f'✅ {analysis.get_analysis_type_display()} completed!')
+            return redirect('view_analysis', analysis_id=analysis.id)
+        
+        # Otherwise workers pick it up from the queue
+        enqueue_analysis(analysis)
+        
+        messages.success(request, f'⏳ {analysis.get_analysis_type_display()} queued!')
         return redirect('view_analysis', analysis_id=analysis.id)
     
     return redirect('codehelper_home')
 
 
+@login_required
+@require_POST
+def analyze_batch(request):
+    """Analyze many files at once (multi-file upload and/or a zip archive)"""
+    analysis_type = request.POST.get('analysis_type', 'explain')
+    language_id = request.POST.get('language')
+    language = get_object_or_404(ProgrammingLanguage, id=language_id) if language_id else None
+    
+    try:
+        files, skipped = read_uploads(
+            request.FILES.getlist('files'),
+            request.FILES.get('archive')
+        )
+    except BatchError as e:
+        return JsonResponse({'error': f'❌ {e}'}, status=400)
+    
+    if not files:
+        return JsonResponse({'error': '❌ No code files found!', 'skipped': skipped}, status=400)
+    
+    batch = create_batch(request.user, files, analysis_type, language)
+    if batch is None:
+        return JsonResponse({'error': '❌ Insufficient tokens! Please buy more.'}, status=402)
+    
+    return JsonResponse({
+        'batch_id': batch.id,
+        'files': batch.total_files,
+        'skipped': [{'file': name, 'reason': reason} for name, reason in skipped],
+        'tokens_used': batch.tokens_used,
+        'status_url': reverse('batch_status', args=[batch.id]),
+    }, status=202)
+
+
+@login_required
+def batch_status(request, batch_id):
+    """Aggregate progress of a batch analysis (polled by the client)"""
+    batch = get_object_or_404(AnalysisBatch, id=batch_id, user=request.user)
+    return JsonResponse(batch.progress())
+
+
 @login_required
 def view_analysis(request, analysis_id):
     """View a single analysis result"""
@@ -86,18 +152,38 @@ def view_analysis(request, analysis_id):
 
 
 @login_required
+def analysis_status(request, analysis_id):
+    """Return the job status of an analysis (polled while it is pending)"""
+    analysis = get_object_or_404(CodeAnalysis, id=analysis_id, user=request.user)
+    
+    data = {
+        'id': analysis.id,
+        'status': analysis.status,
+        'execution_time': analysis.execution_time,
+        'completed_at': analysis.completed_at.isoformat() if analysis.completed_at else None,
+    }
+    if analysis.status == 'completed':
+        data['result'] = analysis.result
+    elif analysis.status == 'failed':
+        data['errors'] = analysis.errors
+    
+    return JsonResponse(data)
+
+
+@login_required
+@read_only_view
 def analysis_history(request):
     """View all user's analyses"""
-    analyses = CodeAnalysis.objects.filter(user=request.user)
+    analyses = CodeAnalysis.objects.filter(user=request.user).select_related('language').only(
+        *CodeAnalysis.LIST_FIELDS
+    )
     
-    # Pagination
-    paginator = Paginator(analyses, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: ?cursor= from next_cursor/previous_cursor, no COUNT
+    page_obj = KeysetPaginator(analyses, 10).get_page(request.GET.get('cursor'))
     
     return render(request, 'codehelper/history.html', {
         'analyses': page_obj,
-        'total': analyses.count()
+        'total': UserCodeStats.for_user(request.user).analysis_count
     })
 
 
@@ -115,37 +201,37 @@ def delete_analysis(request, analysis_id):
 # ============================================
 
 @login_required
+@read_only_view
 def snippet_list(request):
     """List all user's code snippets"""
-    snippets = CodeSnippet.objects.filter(user=request.user)
+    snippets = CodeSnippet.objects.filter(user=request.user).select_related('language').only(
+        *CodeSnippet.LIST_FIELDS
+    )
     
     # Filter by language
     language_filter = request.GET.get('language')
     if language_filter:
         snippets = snippets.filter(language_id=language_filter)
     
-    # Search
+    # Search (full-text index, best match first)
     search_query = request.GET.get('q')
     if search_query:
-        snippets = snippets.filter(
-            Q(title__icontains=search_query) | 
-            Q(description__icontains=search_query) |
-            Q(tags__icontains=search_query)
-        )
-    
-    # Pagination
-    paginator = Paginator(snippets, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        # Ranked results can't be keyset-paged; the match set is small anyway
+        snippets = search_snippets(snippets, search_query)
+        page_obj = Paginator(snippets, 12).get_page(request.GET.get('page'))
+    else:
+        page_obj = KeysetPaginator(snippets, 12).get_page(request.GET.get('cursor'))
     
     # Get all languages for filter dropdown
-    languages = ProgrammingLanguage.objects.filter(is_active=True)
+    languages = active_languages.all()
     
     return render(request, 'codehelper/snippet_list.html', {
         'snippets': page_obj,
+        'liked_ids': SnippetLike.liked_ids(request.user, page_obj.object_list),
         'languages': languages,
         'selected_language': language_filter,
-        'search_query': search_query
+        'search_query': search_query,
+        'total': UserCodeStats.for_user(request.user).snippet_count
     })
 
 
@@ -194,10 +280,30 @@ def create_snippet(request):
         return redirect('view_snippet', snippet_id=snippet.id)
     
     # GET request - show form
-    languages = ProgrammingLanguage.objects.filter(is_active=True)
+    languages = active_languages.all()
     return render(request, 'codehelper/create_snippet.html', {'languages': languages})
 
 
+@login_required
+@require_POST
+def import_snippets(request):
+    """Bulk-create snippets from an NDJSON, zip or gist-style JSON upload"""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': '❌ Please upload a file!'}, status=400)
+    
+    visibility = request.POST.get('visibility', 'private')
+    if visibility not in dict(CodeSnippet.VISIBILITY_CHOICES):
+        return JsonResponse({'error': '❌ Invalid visibility'}, status=400)
+    
+    try:
+        report = run_import(request.user, upload, upload.name, default_visibility=visibility)
+    except SnippetImportError as e:
+        return JsonResponse({'error': f'❌ {e}'}, status=400)
+    
+    return JsonResponse(report.as_dict(), status=201 if report.created else 200)
+
+
 @login_required
 def view_snippet(request, snippet_id):
     """View a single code snippet"""
@@ -216,7 +322,8 @@ def view_snippet(request, snippet_id):
     
     return render(request, 'codehelper/view_snippet.html', {
         'snippet': snippet,
-        'analyses': analyses
+        'analyses': analyses,
+        'liked': snippet.id in SnippetLike.liked_ids(request.user, [snippet])
     })
 
 
@@ -253,7 +360,7 @@ def edit_snippet(request, snippet_id):
         return redirect('view_snippet', snippet_id=snippet.id)
     
     # GET request - show form
-    languages = ProgrammingLanguage.objects.filter(is_active=True)
+    languages = active_languages.all()
     return render(request, 'codehelper/edit_snippet.html', {
         'snippet': snippet,
         'languages': languages
@@ -271,12 +378,26 @@ def delete_snippet(request, snippet_id):
 
 def shared_snippet(request, token):
     """View a shared snippet via token (no login required)"""
-    snippet = get_object_or_404(CodeSnippet, share_token=token, visibility='shared')
-    
-    # Increment view count
-    snippet.increment_views()
-    
-    return render(request, 'codehelper/shared_snippet.html', {'snippet': snippet})
+    # One indexed lookup decides 404 and the cache key; an edit bumps
+    # updated_at, so a cached page never outlives the snippet it shows
+    row = CodeSnippet.objects.filter(
+        share_token=token, visibility='shared'
+    ).values_list('pk', 'updated_at').first()
+    if row is None:
+        raise Http404('No CodeSnippet matches the given query.')
+    pk, updated_at = row
+
+    # Counted on cache hits too
+    view_counter.increment(pk)
+
+    version = updated_at.timestamp()
+    cached = pagecache.get_page(request, 'shared_snippet', token, version)
+    if cached is not None:
+        return cached
+
+    snippet = CodeSnippet.objects.select_related('language', 'blob', 'user').get(pk=pk)
+    response = render(request, 'codehelper/shared_snippet.html', {'snippet': snippet})
+    return pagecache.store_page(request, 'shared_snippet', response, token, version)
 
 
 @login_required
@@ -284,20 +405,12 @@ def fork_snippet(request, snippet_id):
     """Fork (copy) another user's snippet"""
     original = get_object_or_404(CodeSnippet, id=snippet_id)
     
-    # Create forked snippet
-    forked = CodeSnippet.objects.create(
-        user=request.user,
-        title=f"Fork: {original.title}",
-        description=original.description,
-        code=original.code,
-        language=original.language,
-        tags=original.tags,
-        visibility='private',
-        parent_snippet=original
-    )
+    if original.visibility == 'private' and original.user != request.user:
+        messages.error(request, '❌ You do not have permission to fork this snippet!')
+        return redirect('snippet_list')
     
-    original.forks += 1
-    original.save()
+    # Shares the original's code until the fork is edited
+    forked = original.fork(request.user)
     
     messages.success(request, '✅ Snippet forked successfully!')
     return redirect('edit_snippet', snippet_id=forked.id)
@@ -341,7 +454,7 @@ def user_preferences(request):
         messages.success(request, '✅ Preferences saved successfully!')
         return redirect('user_preferences')
     
-    languages = ProgrammingLanguage.objects.filter(is_active=True)
+    languages = active_languages.all()
     return render(request, 'codehelper/preferences.html', {
         'preferences': preferences,
         'languages': languages
@@ -366,24 +479,113 @@ def get_snippet_json(request, snippet_id):
         'tags': snippet.tags,
         'visibility': snippet.visibility,
         'created_at': snippet.created_at.strftime('%Y-%m-%d %H:%M'),
-        'views': snippet.views,
+        'views': snippet.total_views,
         'likes': snippet.likes,
-        'forks': snippet.forks,
+        'liked': snippet.id in SnippetLike.liked_ids(request.user, [snippet]),
+        'forks': snippet.fork_count,
+        'parent': snippet.parent_snippet_id,
+        'root': snippet.root_id,
     }
     
     return JsonResponse(data)
 
 
 @login_required
+def snippet_forks(request, snippet_id):
+    """The fork tree a snippet belongs to: its root and every fork below that root"""
+    snippet = get_object_or_404(CodeSnippet, id=snippet_id)
+    if snippet.visibility == 'private' and snippet.user != request.user:
+        return JsonResponse({'error': 'Snippet not found'}, status=404)
+    
+    root = snippet.root()
+    # Other people's private forks stay hidden
+    forks = root.descendants().filter(
+        Q(visibility__in=['public', 'shared']) | Q(user=request.user)
+    ).select_related('user').only(
+        'id', 'title', 'lineage', 'parent_snippet', 'visibility', 'created_at', 'user__username'
+    ).order_by('lineage', 'id')
+    
+    def node(s):
+        return {
+            'id': s.id,
+            'title': s.title,
+            'user': s.user.username,
+            'parent': s.parent_snippet_id,
+            'depth': len(s.ancestor_ids),
+            'created_at': s.created_at.strftime('%Y-%m-%d %H:%M'),
+        }
+    
+    root_visible = root.visibility != 'private' or root.user_id == request.user.id
+    return JsonResponse({
+        'root': node(root) if root_visible else {'id': root.id},
+        'forks': [node(s) for s in forks],
+    })
+
+
+def _readable_snippet(request, snippet_id):
+    snippet = get_object_or_404(CodeSnippet, id=snippet_id)
+    if snippet.visibility == 'private' and snippet.user != request.user:
+        raise Http404('Snippet not found')
+    return snippet
+
+
+@login_required
+def snippet_revisions(request, snippet_id):
+    """List a snippet's revisions, newest first"""
+    snippet = _readable_snippet(request, snippet_id)
+    return JsonResponse({
+        'snippet': snippet.id,
+        'revisions': [
+            {
+                'number': revision.number,
+                'keyframe': revision.is_keyframe,
+                'size': revision.size,
+                'stored_size': revision.stored_size,
+                'created_at': revision.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            for revision in list_revisions(snippet)
+        ],
+    })
+
+
+@login_required
+def snippet_revision(request, snippet_id, number):
+    """The code of one revision"""
+    snippet = _readable_snippet(request, snippet_id)
+    try:
+        code = reconstruct(snippet, number)
+    except RevisionNotFound as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    return JsonResponse({'snippet': snippet.id, 'number': number, 'code': code})
+
+
+@login_required
+def snippet_revision_diff(request, snippet_id):
+    """Unified diff between ?from=<n> and ?to=<n> (default: the latest revision)"""
+    snippet = _readable_snippet(request, snippet_id)
+    try:
+        to_number = int(request.GET.get('to') or snippet.revisions.order_by('-number').values_list('number', flat=True)[0])
+        from_number = int(request.GET.get('from') or to_number - 1)
+        text = diff_revisions(snippet, from_number, to_number)
+    except (ValueError, IndexError):
+        return JsonResponse({'error': 'from and to must be revision numbers'}, status=400)
+    except RevisionNotFound as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    return JsonResponse({'snippet': snippet.id, 'from': from_number, 'to': to_number, 'diff': text})
+
+
+@login_required
+@require_POST
 def toggle_snippet_like(request, snippet_id):
     """Like/unlike a snippet"""
     snippet = get_object_or_404(CodeSnippet, id=snippet_id)
     
-    # Simple implementation - in production use a Like model
-    snippet.likes += 1
-    snippet.save()
+    if snippet.visibility == 'private' and snippet.user != request.user:
+        return JsonResponse({'error': 'Snippet not found'}, status=404)
+    
+    liked, likes = SnippetLike.toggle(request.user, snippet)
     
-    return JsonResponse({'likes': snippet.likes})
+    return JsonResponse({'liked': liked, 'likes': likes})
 
 
 # ============================================
@@ -416,6 +618,24 @@ RESULT:
     return response
 
 
+@login_required
+def export_all(request):
+    """Stream all of the user's analyses, snippets and blogs as NDJSON (gzipped) or a zip"""
+    try:
+        chunks, content_type, filename = export(
+            request.user,
+            format=request.GET.get('format', 'ndjson'),
+            kinds=parse_kinds(request.GET.get('types')),
+            compress=request.GET.get('compress', 'gzip') != 'none',
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @login_required
 def export_snippet(request, snippet_id):
     """Export snippet as code file"""
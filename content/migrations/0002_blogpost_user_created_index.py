@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['user', '-created_at'], name='content_blo_user_id_e0e4dc_idx'),
+        ),
+    ]
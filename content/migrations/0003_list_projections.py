@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_blogpost_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_size',
+            field=models.PositiveIntegerField(default=0, help_text='Bytes'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='line_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='summary',
+            field=models.CharField(blank=True, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
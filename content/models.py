@@ -5,14 +5,42 @@ from django.db import models
 
 from django.db import models
 from django.conf import settings
+from django.utils.text import Truncator
+
+from core.fields import CompressedTextField
 
 class BlogPost(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
     prompt = models.TextField()
-    content = models.TextField()
+    content = CompressedTextField()
     tokens_used = models.IntegerField(default=50)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Filled on save so my_blogs never loads content
+    summary = models.CharField(max_length=300, blank=True)
+    content_size = models.PositiveIntegerField(default=0, help_text="Bytes")
+    line_count = models.IntegerField(default=0)
+    word_count = models.IntegerField(default=0)
+    
+    LIST_FIELDS = ['id', 'title', 'tokens_used', 'created_at', 'summary', 'content_size', 'line_count', 'word_count']
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return self.title
+    
+    def set_list_fields(self):
+        content = self.content or ''
+        self.summary = Truncator(' '.join(content.split())).chars(300)
+        self.content_size = len(content.encode())
+        self.line_count = len(content.splitlines())
+        self.word_count = len(content.split())
+    
+    def save(self, *args, **kwargs):
+        self.set_list_fields()
+        super().save(*args, **kwargs)
@@ -1,20 +1,31 @@
 # Create content/services.py
 
-import google.generativeai as genai
-from django.conf import settings
+from llm.cache import get_response_cache
+from llm.clients import get_client
 
 class GeminiBlogGenerator:
+    MODEL_NAME = 'gemini-pro'
+    
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        # Shared per-process client; cheap to construct per request
+        self.client = get_client(self.MODEL_NAME)
+        self.cache = get_response_cache('content')
     
-    def generate_blog(self, topic, tone='professional', length='medium'):
+    def _generate(self, prompt):
+        """Call the model, reusing the cached response for an identical prompt"""
+        return self.cache.get_or_generate(
+            prompt, self.MODEL_NAME,
+            lambda: self.client.generate(prompt)
+        )
+    
+    def build_blog_prompt(self, topic, tone='professional', length='medium'):
         length_map = {
             'short': '300 words',
             'medium': '600 words',
             'long': '1000 words'
         }
         
+        topic = ' '.join(topic.split())
         prompt = f"""
         Write a {tone} blog post about: {topic}
         
@@ -27,13 +38,33 @@ class GeminiBlogGenerator:
         
         Blog Post:
         """
+        return prompt
+    
+    def generate_blog(self, topic, tone='professional', length='medium'):
+        prompt = self.build_blog_prompt(topic, tone, length)
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._generate(prompt)
         except Exception as e:
             return f"Error generating blog: {str(e)}"
     
+    def stream_blog(self, topic, tone='professional', length='medium'):
+        """Yield the blog post text chunk by chunk as the model produces it.
+        
+        Unlike generate_blog, errors are raised so the caller can refund.
+        """
+        prompt = self.build_blog_prompt(topic, tone, length)
+        cached = self.cache.get(prompt, self.MODEL_NAME)
+        if cached:
+            yield cached
+            return
+        
+        chunks = []
+        for chunk in self.client.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(prompt, self.MODEL_NAME, ''.join(chunks))
+    
     def improve_content(self, content):
         prompt = f"""
         Improve and rewrite this content to make it more engaging and professional:
@@ -48,7 +79,6 @@ class GeminiBlogGenerator:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._generate(prompt)
         except Exception as e:
             return content
@@ -3,13 +3,23 @@ from django.shortcuts import render
 # Create your views here.
 # Create content/views.py
 
+import json
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+from core.db import read_only_view
 from .models import BlogPost
 from .services import GeminiBlogGenerator
 
+def _title_from_content(content, topic):
+    lines = content.strip().split('\n')
+    return lines[0].replace('#', '').strip() if lines else topic
+
 @login_required
 def blog_writer(request):
     if request.method == 'POST':
@@ -25,12 +35,9 @@ def blog_writer(request):
         generator = GeminiBlogGenerator()
         content = generator.generate_blog(topic, tone, length)
         
-        lines = content.strip().split('\n')
-        title = lines[0].replace('#', '').strip() if lines else topic
-        
         blog = BlogPost.objects.create(
             user=request.user,
-            title=title,
+            title=_title_from_content(content, topic),
             prompt=topic,
             content=content,
             tokens_used=token_cost
@@ -41,14 +48,91 @@ def blog_writer(request):
     
     return render(request, 'content/blog_writer.html')
 
+def _sse(data, event=None):
+    message = f"data: {json.dumps(data)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+def _stream_blog_events(user, topic, tone, length, token_cost):
+    """Forward model chunks as server-sent events, then save the post.
+    
+    Tokens are deducted before streaming starts. If the model fails they are
+    refunded. If the client disconnects, the rest of the post is still
+    generated and saved to "My Blogs", so the charge matches a delivered post.
+    """
+    chunks = []
+    stream = GeminiBlogGenerator().stream_blog(topic, tone, length)
+    
+    def save_blog():
+        content = ''.join(chunks)
+        return BlogPost.objects.create(
+            user=user,
+            title=_title_from_content(content, topic),
+            prompt=topic,
+            content=content,
+            tokens_used=token_cost
+        )
+    
+    try:
+        for chunk in stream:
+            chunks.append(chunk)
+            yield _sse({'text': chunk})
+    except GeneratorExit:
+        # Client went away mid-stream: finish generating and keep the post
+        try:
+            chunks.extend(stream)
+        except Exception:
+            pass
+        if chunks:
+            save_blog()
+        else:
+            user.add_tokens(token_cost, 'blog')
+        raise
+    except Exception as e:
+        user.add_tokens(token_cost, 'blog')
+        yield _sse({'error': f"Error generating blog: {str(e)}"}, event='error')
+        return
+    
+    blog = save_blog()
+    yield _sse({
+        'id': blog.id,
+        'title': blog.title,
+        'url': reverse('view_blog', args=[blog.id]),
+    }, event='done')
+
+@login_required
+@require_POST
+def blog_writer_stream(request):
+    """Streaming (SSE) version of blog_writer"""
+    topic = request.POST.get('topic')
+    tone = request.POST.get('tone', 'professional')
+    length = request.POST.get('length', 'medium')
+    
+    if not topic:
+        return JsonResponse({'error': '❌ Please enter a topic!'}, status=400)
+    
+    token_cost = settings.TOKEN_COSTS['blog']
+    if not request.user.deduct_tokens(token_cost, 'blog'):
+        return JsonResponse({'error': '❌ Insufficient tokens! Please buy more.'}, status=402)
+    
+    response = StreamingHttpResponse(
+        _stream_blog_events(request.user, topic, tone, length, token_cost),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
 @login_required
 def view_blog(request, blog_id):
     blog = get_object_or_404(BlogPost, id=blog_id, user=request.user)
     return render(request, 'content/view_blog.html', {'blog': blog})
 
 @login_required
+@read_only_view
 def my_blogs(request):
-    blogs = BlogPost.objects.filter(user=request.user)
+    blogs = BlogPost.objects.filter(user=request.user).only(*BlogPost.LIST_FIELDS)
     return render(request, 'content/my_blogs.html', {'blogs': blogs})
 
 @login_required
@@ -0,0 +1,180 @@
+"""
+Read replicas and SQLite connection tuning.
+
+``ReplicaRouter`` sends reads to a replica alias only inside a *replica
+context*, and every write goes to ``default``. A replica context is entered by
+
+* a GET/HEAD request to a view decorated with ``@read_only_view``, or to a path
+  under ``DB_REPLICAS['READ_PATH_PREFIXES']`` (admin list pages), or
+* the ``replica_reads()`` context manager, for scripts and reports.
+
+The first write inside a replica context pins the rest of it to the primary,
+so a request reads its own writes. Browsers that just made a POST/PUT/DELETE
+also carry a short-lived pin cookie, so the GET after a redirect does not read
+a replica that has not caught up yet.
+
+A replica that fails its health check (``SELECT 1``) is skipped for
+``HEALTH_CHECK_INTERVAL`` seconds; with no healthy replica, reads fall back to
+the primary.
+
+Every new SQLite connection gets WAL mode and the pragmas in ``SQLITE_PRAGMAS``;
+replica connections are also made ``query_only``.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ALIASES': [],
+    'PIN_SECONDS': 5,
+    'PIN_COOKIE': 'db_pin',
+    'HEALTH_CHECK_INTERVAL': 30,
+    'READ_PATH_PREFIXES': [],
+}
+
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=134217728',
+]
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# None: primary only; 'replica': reads may go to a replica; 'pinned': a write
+# happened, stay on the primary
+_mode = ContextVar('db_routing_mode', default=None)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'DB_REPLICAS', {}))
+    return config
+
+
+class HealthChecker:
+    """Remembers which replicas answered ``SELECT 1`` recently."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = {}
+
+    def is_healthy(self, alias):
+        interval = get_config()['HEALTH_CHECK_INTERVAL']
+        healthy, checked = self._status.get(alias, (None, 0))
+        if healthy is not None and time.monotonic() - checked < interval:
+            return healthy
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            healthy = True
+        except DatabaseError:
+            logger.warning('Replica %s failed its health check', alias, exc_info=True)
+            connections[alias].close()
+            healthy = False
+        with self._lock:
+            self._status[alias] = (healthy, time.monotonic())
+        return healthy
+
+
+health = HealthChecker()
+
+
+def get_replica():
+    """A healthy replica alias, or the primary when there is none."""
+    aliases = [alias for alias in get_config()['ALIASES'] if health.is_healthy(alias)]
+    return random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _mode.get() == 'replica':
+            return get_replica()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _mode.get() == 'replica':
+            _mode.set('pinned')
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    """Let reads in this block go to a replica (until the first write)."""
+    token = _mode.set('replica')
+    try:
+        yield
+    finally:
+        _mode.reset(token)
+
+
+def read_only_view(view_func):
+    """Mark a view whose GET requests may read from a replica."""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        return view_func(*args, **kwargs)
+    wrapper.use_replica = True
+    return wrapper
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                _mode.reset(request._replica_token)
+        config = get_config()
+        if request.method not in SAFE_METHODS and config['ALIASES']:
+            response.set_cookie(
+                config['PIN_COOKIE'], '1', max_age=config['PIN_SECONDS'],
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = get_config()
+        if (
+            config['ALIASES']
+            and request.method in SAFE_METHODS
+            and config['PIN_COOKIE'] not in request.COOKIES
+            and (
+                getattr(view_func, 'use_replica', False)
+                or request.path.startswith(tuple(config['READ_PATH_PREFIXES']))
+            )
+        ):
+            request._replica_token = _mode.set('replica')
+        return None
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """``connection_created`` handler: WAL and pragmas for SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        if connection.alias in get_config()['ALIASES']:
+            cursor.execute('PRAGMA query_only=ON')
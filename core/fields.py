@@ -0,0 +1,130 @@
+"""
+Transparently compressed text columns.
+
+``CompressedTextField`` is a drop-in TextField. Values of at least
+``COMPRESSED_TEXT['THRESHOLD']`` bytes are compressed (zstd when the
+``zstandard`` package is installed, otherwise zlib) and stored as
+
+    \\x01 <algorithm letter> <base64 payload>
+
+in the same text column, so there is no schema change and shorter values stay
+plain text. Rows written before the field existed have no ``\\x01`` prefix and
+are read as they are; ``manage.py compress_text_fields`` compresses them in
+chunks.
+
+Decompression is lazy: a loaded row keeps the stored form until the attribute
+is first read, and saving a row whose value was never read writes the stored
+form back without decompressing it.
+"""
+import base64
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+DEFAULTS = {
+    'THRESHOLD': 1024,
+    'ALGORITHM': 'zstd' if zstandard else 'zlib',
+    'LEVEL': 6,
+}
+
+FLAG = '\x01'
+ZLIB, ZSTD, PLAIN = 'z', 's', 'p'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'COMPRESSED_TEXT', {}))
+    return config
+
+
+class StoredText(str):
+    """A value as stored in the column, not yet decompressed."""
+
+
+def compress(text, algorithm=None, level=None, threshold=None):
+    """The stored form of ``text``."""
+    config = get_config()
+    algorithm = algorithm or config['ALGORITHM']
+    level = config['LEVEL'] if level is None else level
+    threshold = config['THRESHOLD'] if threshold is None else threshold
+
+    raw = text.encode()
+    if len(raw) >= threshold:
+        if algorithm == 'zstd' and zstandard:
+            packed = ZSTD + base64.b64encode(zstandard.ZstdCompressor(level=level).compress(raw)).decode()
+        else:
+            packed = ZLIB + base64.b64encode(zlib.compress(raw, level)).decode()
+        if len(packed) + 1 < len(raw):
+            return FLAG + packed
+    if text.startswith(FLAG):
+        return FLAG + PLAIN + text  # never mistaken for a compressed value
+    return text
+
+
+def decompress(stored):
+    """The text for a stored value (compressed or plain)."""
+    if not stored or not stored.startswith(FLAG):
+        return str(stored) if stored is not None else stored
+    kind, payload = stored[1], stored[2:]
+    if kind == PLAIN:
+        return payload
+    data = base64.b64decode(payload)
+    if kind == ZLIB:
+        return zlib.decompress(data).decode()
+    if kind == ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstandard is required to read this value')
+        return zstandard.ZstdDecompressor().decompress(data).decode()
+    raise ValueError(f'Unknown compression flag {kind!r}')
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    # A data descriptor, so reads go through __get__ even once the value is
+    # in the instance __dict__
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, StoredText):
+            value = decompress(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+
+class CompressedTextField(models.TextField):
+    descriptor_class = CompressedTextDescriptor
+
+    def from_db_value(self, value, expression, connection):
+        if value is not None and value.startswith(FLAG):
+            return StoredText(value)
+        return value
+
+    def to_python(self, value):
+        if isinstance(value, StoredText):
+            return decompress(value)
+        return super().to_python(value)
+
+    def pre_save(self, model_instance, add):
+        # Read past the descriptor so untouched values are not decompressed
+        return model_instance.__dict__.get(self.attname)
+
+    def get_prep_value(self, value):
+        if isinstance(value, StoredText):
+            return str(value)
+        value = super().get_prep_value(value)
+        if value is None:
+            return value
+        return compress(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
@@ -0,0 +1,214 @@
+"""
+Load-testing harness.
+
+``python manage.py seed_benchmark_data`` fills the database with synthetic
+users (usernames starting with ``USER_PREFIX``) and their ledger, analyses,
+snippets and blog posts. ``python manage.py run_benchmark`` then drives the
+main views with concurrent clients and prints one JSON report, so runs can be
+diffed.
+
+Requests go through the whole middleware stack in-process with
+``django.test.Client``: one thread per client, each logged in as a different
+seeded user, each with its own database connection. Running in-process lets
+every request's SQL be counted (``execute_wrapper`` on that thread's
+connections, replicas included); it measures the Django side only, not a WSGI
+server.
+
+Endpoints are run one after another, each with all clients hammering it at
+once, so its throughput is not diluted by the others. The model calls behind
+``blog_writer`` go to the ``stub`` LLM backend (``llm/clients.py``) with a
+fixed latency, and every POST uses a fresh topic or code body so neither the
+response cache nor analysis reuse short-circuits it.
+"""
+import statistics
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from llm.clients import registry
+
+USER_PREFIX = 'bench-'
+
+SAMPLE_CODE = '''def handler(request, item_id):
+    """Return one item as JSON."""
+    item = load(item_id)
+    if item is None:
+        return not_found()
+    return render(item)
+'''
+
+
+def _get(name):
+    def request(client, context):
+        return client.get(reverse(name))
+    return request
+
+
+def _analyze_code(client, context):
+    return client.post(reverse('analyze_code'), {
+        'code': f'# run {uuid.uuid4().hex}\n{SAMPLE_CODE}',
+        'language': context['language_id'],
+        'analysis_type': 'explain',
+    })
+
+
+def _blog_writer(client, context):
+    return client.post(reverse('blog_writer'), {
+        'topic': f'Scaling Django, part {uuid.uuid4().hex[:8]}',
+        'tone': 'professional',
+        'length': 'short',
+    })
+
+
+# name -> (request function, status codes that count as success)
+ENDPOINTS = {
+    'dashboard': (_get('dashboard'), {200}),
+    'analysis_history': (_get('analysis_history'), {200}),
+    'snippet_list': (_get('snippet_list'), {200}),
+    'analyze_code': (_analyze_code, {302}),
+    'blog_writer': (_blog_writer, {302}),
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+class QueryCounter:
+    """``execute_wrapper`` callback counting the statements a thread runs."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _summary(name, samples, errors, elapsed, clients):
+    latencies = sorted(seconds for seconds, _, _ in samples)
+    queries = sorted(count for _, count, _ in samples)
+    statuses = {}
+    for _, _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'endpoint': name,
+        'clients': clients,
+        'requests': len(samples),
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'status_codes': statuses,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'mean': ms(statistics.fmean(latencies)) if latencies else None,
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(latencies[-1]) if latencies else None,
+        },
+        'queries_per_request': {
+            'mean': round(statistics.fmean(queries), 1) if queries else None,
+            'p50': percentile(queries, 50),
+            'max': queries[-1] if queries else None,
+        },
+    }
+
+
+def run_endpoint(name, users, context, requests, warmup=0):
+    """Send ``requests`` requests to one endpoint from ``len(users)`` concurrent clients."""
+    send, ok_statuses = ENDPOINTS[name]
+    clients = len(users)
+    samples, errors = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+    done = threading.Barrier(clients + 1)
+    per_client = [requests // clients + (i < requests % clients) for i in range(clients)]
+
+    def worker(user, count):
+        client = Client(raise_request_exception=False)
+        mine, my_errors = [], []
+        try:
+            client.force_login(user)
+            for _ in range(warmup):
+                send(client, context)
+        except Exception as e:
+            my_errors.append(f'setup: {type(e).__name__}: {e}')
+            count = 0
+        finally:
+            start.wait()
+        counter = QueryCounter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(counter))
+                for _ in range(count):
+                    counter.count = 0
+                    started = time.perf_counter()
+                    try:
+                        status = send(client, context).status_code
+                    except Exception as e:
+                        status = 'exception'
+                        my_errors.append(f'{type(e).__name__}: {e}')
+                    else:
+                        if status not in ok_statuses:
+                            my_errors.append(f'HTTP {status}')
+                    mine.append((time.perf_counter() - started, counter.count, status))
+        finally:
+            with lock:
+                samples.extend(mine)
+                errors.extend(my_errors)
+            done.wait()
+            connections.close_all()
+
+    pool = [
+        threading.Thread(target=worker, args=(user, count), daemon=True)
+        for user, count in zip(users, per_client)
+    ]
+    for thread in pool:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    done.wait()
+    elapsed = time.perf_counter() - started
+    for thread in pool:
+        thread.join()
+    return _summary(name, samples, errors, elapsed, clients)
+
+
+def run(users, endpoints, requests, language_id, warmup=0, llm_latency=0.05):
+    """Benchmark each of ``endpoints`` in turn; returns the JSON-ready report."""
+    llm = dict(getattr(settings, 'LLM_CLIENT', {}), BACKEND='stub', STUB_LATENCY=llm_latency)
+    context = {'language_id': language_id}
+    results = []
+    with override_settings(LLM_CLIENT=llm):
+        registry.reset()
+        try:
+            for name in endpoints:
+                results.append(run_endpoint(name, users, context, requests, warmup))
+        finally:
+            registry.reset()
+    return {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'database': connections['default'].vendor,
+        'clients': len(users),
+        'requests_per_endpoint': requests,
+        'warmup_per_client': warmup,
+        'llm_stub_latency': llm_latency,
+        'endpoints': results,
+    }
@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import pagecache
+
+
+class Command(BaseCommand):
+    help = 'Report page cache hits, misses and hit rate per page (JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after reporting')
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(pagecache.stats(), indent=2))
+        if options['reset']:
+            pagecache.reset_stats()
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from codehelper.refdata import active_languages
+from core import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the main views with concurrent clients and report latency percentiles, '
+        'throughput and SQL queries per endpoint as JSON (seed data first with seed_benchmark_data)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', default=','.join(loadtest.ENDPOINTS),
+                            help=f"Comma-separated subset of: {', '.join(loadtest.ENDPOINTS)}")
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent clients (threads)')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per client first')
+        parser.add_argument('--llm-latency', type=float, default=0.05,
+                            help='Seconds the stub LLM takes per blog post')
+        parser.add_argument('--output', help='Also write the report to this file')
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(loadtest.ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+        if options['clients'] < 1 or options['requests'] < 1:
+            raise CommandError('--clients and --requests must be at least 1')
+
+        users = list(
+            User.objects.filter(username__startswith=loadtest.USER_PREFIX, is_active=True)
+            .order_by('pk')[:options['clients']]
+        )
+        if len(users) < options['clients']:
+            raise CommandError(
+                f"Need {options['clients']} benchmark users, found {len(users)}; "
+                f"run seed_benchmark_data --users {options['clients']} first"
+            )
+        language = active_languages.all()[:1]
+        if not language:
+            raise CommandError('No active ProgrammingLanguage; run seed_benchmark_data first')
+
+        report = loadtest.run(
+            users, endpoints, options['requests'], language[0].pk,
+            warmup=options['warmup'], llm_latency=options['llm_latency'],
+        )
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
@@ -0,0 +1,237 @@
+import json
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import TokenTransaction, User
+from codehelper.models import CodeAnalysis, CodeBlob, CodeSnippet, ProgrammingLanguage, UserCodeStats
+from codehelper.refdata import active_languages
+from codehelper.search import index_snippets
+from content.models import BlogPost
+from core.loadtest import USER_PREFIX
+
+PASSWORD = 'benchmark'
+
+LANGUAGES = [
+    ('Python', 'python', 'fab fa-python'),
+    ('JavaScript', 'javascript', 'fab fa-js'),
+    ('Go', 'go', 'fas fa-code'),
+]
+
+WORDS = (
+    'cache', 'query', 'index', 'token', 'stream', 'worker', 'request', 'latency',
+    'parser', 'router', 'session', 'handler', 'queue', 'retry', 'buffer', 'schema',
+)
+
+SERVICES = [('codehelper', 40), ('blog', 50), ('image', 100), ('resume', 30)]
+
+
+def _words(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def _code(rng, functions):
+    parts = []
+    for i in range(functions):
+        name = f'{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i}'
+        parts.append(
+            f'def {name}(items, limit={rng.randint(1, 100)}):\n'
+            f'    """{_words(rng, 6).capitalize()}."""\n'
+            f'    result = []\n'
+            f'    for item in items[:limit]:\n'
+            f'        if item.{rng.choice(WORDS)} > {rng.randint(0, 9)}:\n'
+            f'            result.append(item)\n'
+            f'    return result\n'
+        )
+    return '\n\n'.join(parts)
+
+
+def _markdown(rng, paragraphs):
+    body = '\n\n'.join(_words(rng, 40).capitalize() + '.' for _ in range(paragraphs))
+    return f'# {_words(rng, 4).title()}\n\n{body}'
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class Command(BaseCommand):
+    help = (
+        'Create synthetic users with token ledgers, analyses, snippets and blog posts '
+        f'for run_benchmark (usernames start with "{USER_PREFIX}", password "{PASSWORD}")'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--transactions', type=int, default=200, help='Ledger rows per user')
+        parser.add_argument('--analyses', type=int, default=100, help='Code analyses per user')
+        parser.add_argument('--snippets', type=int, default=50, help='Snippets per user')
+        parser.add_argument('--blogs', type=int, default=20, help='Blog posts per user')
+        parser.add_argument('--days', type=int, default=90, help='Spread rows over this many past days')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=None, help='Random seed, for repeatable data')
+        parser.add_argument('--clear', action='store_true',
+                            help=f'Delete earlier "{USER_PREFIX}" users and their rows first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = max(1, options['days'])
+        started = time.perf_counter()
+
+        if options['clear']:
+            with transaction.atomic():
+                deleted, _ = User.objects.filter(username__startswith=USER_PREFIX).delete()
+            self.stderr.write(f'Deleted {deleted} rows of earlier benchmark data')
+
+        languages = self.languages()
+        users = self.create_users(options['users'])
+        counts = {'users': len(users)}
+        for user in users:
+            # One transaction per user keeps SQLite write locks short
+            with transaction.atomic():
+                counts['transactions'] = counts.get('transactions', 0) + self.create_transactions(
+                    user, options['transactions']
+                )
+                analyses = self.create_analyses(user, options['analyses'], languages)
+                snippets = self.create_snippets(user, options['snippets'], languages)
+                UserCodeStats.objects.create(user=user, analysis_count=analyses, snippet_count=snippets)
+                blogs = self.create_blogs(user, options['blogs'])
+            counts['analyses'] = counts.get('analyses', 0) + analyses
+            counts['snippets'] = counts.get('snippets', 0) + snippets
+            counts['blogs'] = counts.get('blogs', 0) + blogs
+
+        if users:
+            call_command('rebuild_usage_rollups', users=[user.pk for user in users], stdout=self.stderr)
+        counts['seconds'] = round(time.perf_counter() - started, 2)
+        self.stdout.write(json.dumps(counts, indent=2))
+
+    def when(self):
+        return self.now - timedelta(seconds=self.rng.randint(0, self.days * 86400))
+
+    def insert(self, model, rows, fields=('created_at',)):
+        """bulk_create ``[(obj, when)]`` oldest first, then backdate ``fields``.
+
+        ``auto_now_add`` overwrites ``created_at`` on insert, so the real
+        timestamps go in with one ``bulk_update`` per batch.
+        """
+        rows.sort(key=lambda row: row[1])
+        created = []
+        for chunk in _chunks(rows, self.batch_size):
+            objs = model.objects.bulk_create([obj for obj, _ in chunk])
+            for obj, (_, when) in zip(objs, chunk):
+                for field in fields:
+                    setattr(obj, field, when)
+            model.objects.bulk_update(objs, list(fields))
+            created.extend(objs)
+        return created
+
+    def languages(self):
+        languages = list(active_languages.all())
+        if not languages:
+            for name, slug, icon in LANGUAGES:
+                ProgrammingLanguage.objects.get_or_create(slug=slug, defaults={'name': name, 'icon': icon})
+            languages = list(ProgrammingLanguage.objects.filter(is_active=True))
+        return languages
+
+    def create_users(self, count):
+        tag = uuid.uuid4().hex[:6]
+        password = make_password(PASSWORD)  # hashing is slow; every user shares one hash
+        users = [
+            User(
+                username=f'{USER_PREFIX}{tag}-{i}',
+                email=f'{USER_PREFIX}{tag}-{i}@example.com',
+                password=password,
+                token_balance=10 ** 9,
+            )
+            for i in range(count)
+        ]
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def create_transactions(self, user, count):
+        rows = []
+        for _ in range(count):
+            if self.rng.random() < 0.1:
+                amount, service_type = self.rng.choice([1000, 5000, 10000]), 'purchase'
+            else:
+                service_type, cost = self.rng.choice(SERVICES)
+                amount = -cost
+            rows.append((TokenTransaction(user=user, amount=amount, service_type=service_type, balance_after=0),
+                         self.when()))
+        # Running balance, oldest first, ending at the user's balance
+        rows.sort(key=lambda row: row[1])
+        balance = user.token_balance - sum(entry.amount for entry, _ in rows)
+        for entry, _ in rows:
+            balance += entry.amount
+            entry.balance_after = balance
+        return len(self.insert(TokenTransaction, rows))
+
+    def create_analyses(self, user, count, languages):
+        types = [value for value, _ in CodeAnalysis.ANALYSIS_TYPES]
+        rows = []
+        for _ in range(count):
+            status = self.rng.choices(['completed', 'failed', 'pending'], weights=[90, 5, 5])[0]
+            analysis = CodeAnalysis(
+                user=user,
+                language=self.rng.choice(languages),
+                analysis_type=self.rng.choice(types),
+                status=status,
+                result=_markdown(self.rng, self.rng.randint(2, 8)) if status == 'completed' else '',
+                execution_time=round(self.rng.uniform(0.5, 8), 2) if status == 'completed' else None,
+            )
+            analysis.code = _code(self.rng, self.rng.randint(1, 12))
+            analysis.title = f'{analysis.get_analysis_type_display()} - {analysis.language} ({_words(self.rng, 3)}...)'
+            analysis.set_list_fields()  # bulk_create skips save()
+            rows.append((analysis, self.when()))
+        CodeBlob.store_many(analysis.code for analysis, _ in rows)
+        created = self.insert(CodeAnalysis, rows, ('created_at', 'updated_at'))
+        completed = [analysis for analysis in created if analysis.status == 'completed']
+        for analysis in completed:
+            analysis.completed_at = analysis.created_at + timedelta(seconds=analysis.execution_time)
+        CodeAnalysis.objects.bulk_update(completed, ['completed_at'], batch_size=self.batch_size)
+        return len(created)
+
+    def create_snippets(self, user, count, languages):
+        visibilities = [value for value, _ in CodeSnippet.VISIBILITY_CHOICES]
+        rows = []
+        for _ in range(count):
+            visibility = self.rng.choice(visibilities)
+            snippet = CodeSnippet(
+                user=user,
+                title=_words(self.rng, 4).capitalize(),
+                description=_words(self.rng, 12).capitalize() + '.',
+                language=self.rng.choice(languages),
+                tags=self.rng.sample(WORDS, self.rng.randint(0, 4)),
+                visibility=visibility,
+                share_token=uuid.uuid4().hex if visibility == 'shared' else None,
+            )
+            snippet.code = _code(self.rng, self.rng.randint(1, 6))
+            snippet.set_list_fields()
+            rows.append((snippet, self.when()))
+        CodeBlob.store_many(snippet.code for snippet, _ in rows)
+        created = self.insert(CodeSnippet, rows, ('created_at', 'updated_at'))
+        index_snippets(created)
+        return len(created)
+
+    def create_blogs(self, user, count):
+        rows = []
+        for _ in range(count):
+            content = _markdown(self.rng, self.rng.randint(4, 12))
+            post = BlogPost(
+                user=user,
+                title=content.split('\n', 1)[0].lstrip('# '),
+                prompt=_words(self.rng, 5),
+                content=content,
+            )
+            post.set_list_fields()
+            rows.append((post, self.when()))
+        return len(self.insert(BlogPost, rows))
@@ -0,0 +1,38 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.db import get_config
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the replica files (local replica testing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('aliases', nargs='*', help='Replica aliases (default: all)')
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if 'sqlite3' not in primary['ENGINE']:
+            raise CommandError('sync_replica only copies SQLite databases; use real replication elsewhere')
+
+        aliases = options['aliases'] or get_config()['ALIASES']
+        if not aliases:
+            raise CommandError('No replicas configured (set DATABASE_REPLICAS)')
+
+        source = sqlite3.connect(str(primary['NAME']))
+        try:
+            for alias in aliases:
+                if alias not in settings.DATABASES:
+                    raise CommandError(f'Unknown database alias {alias!r}')
+                target = sqlite3.connect(str(settings.DATABASES[alias]['NAME']))
+                try:
+                    # Online backup: consistent even while the primary is written
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(f'Copied primary to {alias}'))
+        finally:
+            source.close()
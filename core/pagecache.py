@@ -0,0 +1,170 @@
+"""
+Page caching for public pages.
+
+Anonymous GET requests to ``home``, ``pricing`` and ``shared_snippet`` are
+answered from the ``CACHES`` backend. The key is made of
+
+* the page's namespace version, renewed after commit whenever a watched model
+  is saved or deleted (``watch('pricing', Plan)``),
+* the extra parts the view passes in (share token, ``updated_at``), and
+* the path and query string.
+
+Logged-in users always get a fresh page (token balance, username and
+messages differ per user); the static parts of those templates use
+``{% cache %}`` fragments instead. A response that sets a cookie or a CSRF
+token, or a request with pending flash messages, is never cached.
+
+Hits and misses are counted per namespace in the cache;
+``python manage.py page_cache_stats`` reports them.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import patch_vary_headers
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'ENABLED': True,
+}
+
+NAMESPACES_KEY = 'pagecache:namespaces'
+
+_known = set()
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PAGE_CACHE', {}))
+    return config
+
+
+def _cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def version(namespace):
+    """The current version of ``namespace``; part of every key in it."""
+    cache = _cache()
+    key = f'pagecache:{namespace}:version'
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def invalidate(namespace):
+    _cache().set(f'pagecache:{namespace}:version', time.time_ns(), timeout=None)
+
+
+def watch(namespace, *models):
+    """Invalidate ``namespace`` whenever one of ``models`` changes."""
+    def changed(sender, raw=False, **kwargs):
+        if not raw:
+            transaction.on_commit(lambda: invalidate(namespace))
+
+    for model in models:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                changed, sender=model, weak=False,
+                dispatch_uid=f'pagecache:{namespace}:{model._meta.label}:{signal is post_save}'
+            )
+
+
+def cacheable(request):
+    """Only anonymous GETs with no flash messages waiting are shared."""
+    return (
+        get_config()['ENABLED']
+        and request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and 'messages' not in request.COOKIES
+        and '_messages' not in request.session
+    )
+
+
+def _key(request, namespace, parts):
+    raw = '|'.join([request.get_full_path(), *map(str, parts)])
+    return f'pagecache:{namespace}:{version(namespace)}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def _record(namespace, outcome):
+    cache = _cache()
+    key = f'pagecache:{namespace}:{outcome}'
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+    if namespace not in _known:
+        _known.add(namespace)
+        namespaces = set(cache.get(NAMESPACES_KEY) or ())
+        if namespace not in namespaces:
+            cache.set(NAMESPACES_KEY, sorted(namespaces | {namespace}), timeout=None)
+
+
+def get_page(request, namespace, *parts):
+    """A cached response for this request, or None."""
+    if not cacheable(request):
+        return None
+    response = _cache().get(_key(request, namespace, parts))
+    _record(namespace, 'hits' if response is not None else 'misses')
+    if response is not None:
+        response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def store_page(request, namespace, response, *parts, timeout=None):
+    """Cache ``response`` if it is safe to share, and return it."""
+    patch_vary_headers(response, ['Cookie'])
+    if (
+        cacheable(request)
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    ):
+        timeout = get_config()['TIMEOUT'] if timeout is None else timeout
+        _cache().set(_key(request, namespace, parts), response, timeout)
+        response['X-Page-Cache'] = 'MISS'
+    return response
+
+
+def cache_anonymous_page(namespace, timeout=None):
+    """Decorator: serve anonymous GETs of a view from the page cache."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            cached = get_page(request, namespace)
+            if cached is not None:
+                return cached
+            return store_page(request, namespace, view_func(request, *args, **kwargs), timeout=timeout)
+        return wrapper
+    return decorator
+
+
+def stats():
+    """``{namespace: {'hits', 'misses', 'hit_rate'}}`` across all processes."""
+    cache = _cache()
+    result = {}
+    for namespace in cache.get(NAMESPACES_KEY) or ():
+        hits = cache.get(f'pagecache:{namespace}:hits', 0)
+        misses = cache.get(f'pagecache:{namespace}:misses', 0)
+        total = hits + misses
+        result[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 3) if total else None,
+        }
+    return result
+
+
+def reset_stats():
+    cache = _cache()
+    for namespace in cache.get(NAMESPACES_KEY) or ():
+        cache.delete_many([f'pagecache:{namespace}:hits', f'pagecache:{namespace}:misses'])
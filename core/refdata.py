@@ -0,0 +1,87 @@
+"""
+Cached reference data.
+
+Small, rarely edited tables (active languages, plans) are read on almost every
+page. ``ReferenceData.all()`` returns them from a per-process copy, falling
+back to the shared ``CACHES`` backend and then the database.
+
+Invalidation uses a version key in the shared cache: any save or delete of a
+watched model (admin edits included) writes a new version once the
+transaction commits. Every process compares its copy's version with the
+shared one at most every ``LOCAL_TTL`` seconds and reloads when it changed, so
+all workers drop stale data together. With the default per-process
+``LocMemCache`` only the process that made the edit sees it immediately;
+point ``CACHES`` at Redis to share versions between workers.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60,
+    'LOCAL_TTL': 5,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'REFERENCE_DATA', {}))
+    return config
+
+
+class ReferenceData:
+    def __init__(self, name, loader, models):
+        """``loader`` returns the rows; a change to any of ``models`` invalidates them."""
+        self.name = name
+        self.loader = loader
+        self.version_key = f'refdata:{name}:version'
+        self._value = None
+        self._version = None
+        self._checked = 0
+        for model in models:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    self._changed, sender=model, weak=False,
+                    dispatch_uid=f'refdata:{name}:{model._meta.label}:{signal is post_save}'
+                )
+
+    @property
+    def cache(self):
+        return caches[get_config()['CACHE_ALIAS']]
+
+    def version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def all(self):
+        """The rows, as a list."""
+        config = get_config()
+        now = time.monotonic()
+        if self._value is not None and now - self._checked < config['LOCAL_TTL']:
+            return self._value
+
+        version = self.version()
+        if self._value is None or version != self._version:
+            key = f'refdata:{self.name}:{version}'
+            value = self.cache.get(key)
+            if value is None:
+                value = list(self.loader())
+                self.cache.set(key, value, config['TIMEOUT'])
+            self._value, self._version = value, version
+        self._checked = now
+        return self._value
+
+    def invalidate(self):
+        self.cache.set(self.version_key, time.time_ns(), timeout=None)
+        self._value = None
+
+    def _changed(self, sender, raw=False, **kwargs):
+        if not raw:
+            transaction.on_commit(self.invalidate)
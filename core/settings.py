@@ -31,6 +31,9 @@ INSTALLED_APPS = [
     'resume',
       'codehelper',
     'subscription',
+    'llm',
+    'api',
+    'core',
 ]
 
 # Token costs
@@ -45,7 +48,8 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.db.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -77,9 +81,51 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'timeout': 20},
+        'CONN_MAX_AGE': 600,  # persistent connections...
+        'CONN_HEALTH_CHECKS': True,  # ...checked before reuse
     }
 }
 
+# Shared cache. LocMemCache is per process; set CACHE_BACKEND=redis so
+# reference-data invalidation (core/refdata.py) reaches every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'aiforge',
+    }
+}
+if os.getenv('CACHE_BACKEND') == 'redis':
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    }
+
+# Cached languages/plans (core/refdata.py)
+REFERENCE_DATA = {
+    'TIMEOUT': 60 * 60,
+    'LOCAL_TTL': 5,  # seconds a process trusts its copy before re-checking the version
+}
+
+# Whole-page cache for anonymous home/pricing/shared snippet pages (core/pagecache.py)
+PAGE_CACHE = {
+    'TIMEOUT': 300,
+    'ENABLED': True,
+}
+
+# Read replicas (core/db.py), e.g. DATABASE_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+# Locally, `python manage.py sync_replica` copies db.sqlite3 into the replica files.
+DB_REPLICAS = {
+    'ALIASES': [],
+    'PIN_SECONDS': 5,  # reads stay on the primary this long after a write request
+    'HEALTH_CHECK_INTERVAL': 30,
+    'READ_PATH_PREFIXES': ['/admin/'],
+}
+for i, path in enumerate(filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{i}'] = dict(DATABASES['default'], NAME=path.strip(), TEST={'MIRROR': 'default'})
+    DB_REPLICAS['ALIASES'].append(f'replica{i}')
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -118,6 +164,16 @@ LOGOUT_REDIRECT_URL = 'home'
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
+STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
+
+# Stripe webhook processing (subscription/webhooks.py)
+STRIPE_WEBHOOKS = {
+    'TOLERANCE': 300,  # seconds a signature stays valid
+    'BATCH_SIZE': 100,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 5,
+    'EAGER': os.getenv('STRIPE_WEBHOOKS_EAGER') == 'True',  # apply right after the response, no processor needed
+}
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
@@ -130,6 +186,95 @@ TOKEN_COSTS = {
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Background code analysis jobs (python manage.py run_analysis_workers)
+CODEHELPER_JOBS = {
+    'BACKEND': os.getenv('CODEHELPER_JOB_BACKEND', 'db'),  # 'db' (no Redis needed) or 'redis'
+    'REDIS_URL': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    'WORKERS': int(os.getenv('CODEHELPER_WORKERS', 4)),
+    'POLL_INTERVAL': 1.0,
+    'STALE_AFTER': 600,  # seconds before a stuck 'processing' job is retried
+    'EAGER': os.getenv('CODEHELPER_JOBS_EAGER') == 'True',
+}
+
+# Batch code analysis uploads (codehelper/batch.py)
+CODEHELPER_BATCH = {
+    'MAX_FILES': 500,
+    'MAX_FILE_SIZE': 200 * 1024,  # bytes per file
+    'MAX_TOTAL_SIZE': 20 * 1024 * 1024,  # bytes per batch, uncompressed
+}
+DATA_UPLOAD_MAX_NUMBER_FILES = CODEHELPER_BATCH['MAX_FILES']
+
+# Bulk snippet import (codehelper/importer.py)
+CODEHELPER_IMPORT = {
+    'BATCH_SIZE': 500,  # snippets per bulk_create
+    'MAX_RECORDS': 10000,  # per upload
+    'MAX_CODE_SIZE': 200 * 1024,  # bytes per snippet
+}
+
+# Snippet revision history (codehelper/revisions.py)
+CODEHELPER_REVISIONS = {
+    'KEYFRAME_INTERVAL': 50,  # a full copy every N revisions bounds reconstruction to N-1 deltas
+}
+
+# Snippet full-text search (codehelper/search.py)
+CODEHELPER_SEARCH = {
+    'INDEX_CODE': os.getenv('CODEHELPER_SEARCH_INDEX_CODE', 'True') == 'True',  # also search snippet code
+}
+
+# Buffered snippet view counters (codehelper/counters.py)
+CODEHELPER_COUNTERS = {
+    'FLUSH_INTERVAL': 5,  # seconds between batched UPDATEs
+    'MAX_PENDING': 1000,  # flush early once this many snippets have pending views
+}
+
+# REST API (api/), versioned as /api/v1/
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.APIKeyAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_THROTTLE_CLASSES': ['api.authentication.APIKeyRateThrottle'],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CreatedAtCursorPagination',
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    'DEFAULT_VERSION': 'v1',
+    'ALLOWED_VERSIONS': ['v1'],
+}
+
+# Compressed text columns (core/fields.py); zstd is used when zstandard is installed
+COMPRESSED_TEXT = {
+    'THRESHOLD': 1024,  # bytes; shorter values are stored as plain text
+    'LEVEL': 6,
+}
+
+# API key rate limits (codehelper/ratelimit.py): token buckets, RATE per minute
+API_RATE_LIMIT = {
+    'BACKEND': os.getenv('API_RATE_LIMIT_BACKEND', 'local'),  # 'local' (per process) or 'redis' (shared)
+    'REDIS_URL': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    'PLANS': {
+        'free': {'RATE': 20, 'BURST': 10},
+        'basic': {'RATE': 60, 'BURST': 30},
+        'pro': {'RATE': 300, 'BURST': 100},
+        'enterprise': {'RATE': 1200, 'BURST': 400},
+    },
+}
+
+# Shared per-process LLM clients (llm/clients.py)
+LLM_CLIENT = {
+    'BACKEND': os.getenv('LLM_BACKEND', 'gemini'),  # 'gemini' or 'stub' (offline, for load tests)
+    'TIMEOUT': float(os.getenv('LLM_TIMEOUT', 60)),  # seconds per model call
+    'MAX_CONCURRENCY': int(os.getenv('LLM_MAX_CONCURRENCY', 8)),  # in-flight calls per process
+    'STUB_LATENCY': float(os.getenv('LLM_STUB_LATENCY', 0.5)),
+}
+
+# Exact-match cache for model responses (llm/cache.py)
+LLM_CACHE = {
+    'BACKEND': os.getenv('LLM_CACHE_BACKEND', 'memory'),  # 'memory', 'file', 'db' or 'none'
+    'TTL': 60 * 60 * 24,
+    'MAX_ENTRIES': int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1000)),
+    'LOCATION': BASE_DIR / 'llm_cache',  # used by the 'file' backend
+}
 # Fix Python path
 import os
 import sys
@@ -12,6 +12,7 @@ urlpatterns = [
    path('code/', include('codehelper.urls')),
 
     path('subscription/', include('subscription.urls')),
+    path('api/', include('api.urls')),
 ]
 
 if settings.DEBUG:
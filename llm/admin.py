@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import CachedResponse
+
+
+@admin.register(CachedResponse)
+class CachedResponseAdmin(admin.ModelAdmin):
+    list_display = ['key', 'hits', 'created_at', 'last_accessed', 'expires_at']
+    list_filter = ['created_at', 'expires_at']
+    search_fields = ['key', 'value']
+    readonly_fields = ['key', 'hits', 'created_at', 'last_accessed']
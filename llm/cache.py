@@ -0,0 +1,361 @@
+"""
+Exact-match cache for model responses.
+
+Responses are keyed on a SHA-256 of (namespace, model name, normalized prompt),
+so two requests only share an entry when they would send the same prompt to the
+same model. Entries expire after a TTL and each backend is size bounded with
+least-recently-used eviction.
+
+Backends (``LLM_CACHE['BACKEND']``):
+
+* ``memory`` - per-process OrderedDict (default)
+* ``file``   - one JSON file per entry under ``LLM_CACHE['LOCATION']``
+* ``db``     - the ``llm.CachedResponse`` table, shared by every worker
+* ``none``   - caching disabled
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import textwrap
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'memory',
+    'TTL': 60 * 60 * 24,
+    'MAX_ENTRIES': 1000,
+    'CULL_FREQUENCY': 20,
+    'LOCATION': None,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_CACHE', {}))
+    return config
+
+
+def normalize_prompt(prompt):
+    """Drop formatting noise that does not change what the model is asked.
+
+    Line endings, trailing spaces, surrounding blank lines and the common
+    indentation of the prompt template are normalized. Relative indentation
+    is kept because it is significant in submitted code.
+    """
+    lines = [line.rstrip() for line in prompt.replace('\r\n', '\n').split('\n')]
+    return textwrap.dedent('\n'.join(lines)).strip('\n')
+
+
+def make_key(prompt, model_name, namespace=''):
+    raw = '\x00'.join([namespace, model_name, normalize_prompt(prompt)])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+class NullBackend:
+    """Caching disabled."""
+
+    def __init__(self, config):
+        pass
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self, expired_only=False):
+        return 0
+
+    def __len__(self):
+        return 0
+
+
+class MemoryBackend(NullBackend):
+    """Per-process LRU dictionary."""
+
+    def __init__(self, config):
+        self.max_entries = config['MAX_ENTRIES']
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, expired_only=False):
+        with self._lock:
+            if not expired_only:
+                count = len(self._data)
+                self._data.clear()
+                return count
+            now = time.time()
+            expired = [key for key, (expires, _) in self._data.items() if expires < now]
+            for key in expired:
+                del self._data[key]
+            return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FileBackend(NullBackend):
+    """One JSON file per entry; file mtime tracks last access for LRU."""
+
+    def __init__(self, config):
+        self.max_entries = config['MAX_ENTRIES']
+        self.cull_frequency = config['CULL_FREQUENCY']
+        self.location = Path(config['LOCATION'] or Path(settings.BASE_DIR) / 'llm_cache')
+        self.location.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.location / key[:2] / f'{key}.json'
+
+    def _files(self):
+        return list(self.location.glob('*/*.json'))
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires'] < time.time():
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['value']
+
+    def set(self, key, value, ttl):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'expires': time.time() + ttl, 'value': value}, f)
+        os.replace(tmp, path)
+        if random.randrange(self.cull_frequency) == 0:
+            self._cull()
+
+    def _cull(self):
+        files = self._files()
+        excess = len(files) - self.max_entries
+        if excess <= 0:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:excess]:
+            path.unlink(missing_ok=True)
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self, expired_only=False):
+        count = 0
+        now = time.time()
+        for path in self._files():
+            if expired_only:
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        if json.load(f)['expires'] >= now:
+                            continue
+                except (OSError, ValueError):
+                    pass
+            path.unlink(missing_ok=True)
+            count += 1
+        return count
+
+    def __len__(self):
+        return len(self._files())
+
+
+class DatabaseBackend(NullBackend):
+    """Entries in llm.CachedResponse, shared by every worker process."""
+
+    def __init__(self, config):
+        self.max_entries = config['MAX_ENTRIES']
+        self.cull_frequency = config['CULL_FREQUENCY']
+
+    def get(self, key):
+        from .models import CachedResponse
+
+        now = timezone.now()
+        entry = CachedResponse.objects.filter(key=key, expires_at__gt=now).only('value').first()
+        if entry is None:
+            return None
+        CachedResponse.objects.filter(key=key).update(hits=F('hits') + 1, last_accessed=now)
+        return entry.value
+
+    def set(self, key, value, ttl):
+        from .models import CachedResponse
+
+        now = timezone.now()
+        CachedResponse.objects.update_or_create(
+            key=key,
+            defaults={
+                'value': value,
+                'expires_at': now + timedelta(seconds=ttl),
+                'last_accessed': now,
+            },
+        )
+        if random.randrange(self.cull_frequency) == 0:
+            self._cull()
+
+    def _cull(self):
+        from .models import CachedResponse
+
+        CachedResponse.objects.filter(expires_at__lte=timezone.now()).delete()
+        excess = CachedResponse.objects.count() - self.max_entries
+        if excess > 0:
+            oldest = CachedResponse.objects.order_by('last_accessed').values_list('key', flat=True)[:excess]
+            CachedResponse.objects.filter(key__in=list(oldest)).delete()
+
+    def delete(self, key):
+        from .models import CachedResponse
+
+        CachedResponse.objects.filter(key=key).delete()
+
+    def clear(self, expired_only=False):
+        from .models import CachedResponse
+
+        entries = CachedResponse.objects.all()
+        if expired_only:
+            entries = entries.filter(expires_at__lte=timezone.now())
+        return entries.delete()[0]
+
+    def __len__(self):
+        from .models import CachedResponse
+
+        return CachedResponse.objects.count()
+
+
+BACKENDS = {
+    'none': NullBackend,
+    'memory': MemoryBackend,
+    'file': FileBackend,
+    'db': DatabaseBackend,
+}
+
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+class ResponseCache:
+    """Namespaced view of a backend with hit/miss counters."""
+
+    def __init__(self, backend, namespace='', ttl=None):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl or get_config()['TTL']
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, prompt, model_name):
+        return make_key(prompt, model_name, self.namespace)
+
+    def get(self, prompt, model_name):
+        try:
+            value = self.backend.get(self.key(prompt, model_name))
+        except Exception:
+            logger.exception('LLM cache lookup failed')
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, prompt, model_name, value):
+        try:
+            self.backend.set(self.key(prompt, model_name), value, self.ttl)
+        except Exception:
+            logger.exception('LLM cache store failed')
+
+    def get_or_generate(self, prompt, model_name, generate):
+        """Return the cached response, calling ``generate()`` on a miss.
+
+        Exceptions from ``generate`` propagate and nothing is cached, so
+        failed calls are retried on the next request.
+        """
+        value = self.get(prompt, model_name)
+        if value is None:
+            value = generate()
+            if value:
+                self.set(prompt, model_name, value)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_backend = None
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        config = get_config()
+        _backend = BACKENDS[config['BACKEND']](config)
+    return _backend
+
+
+def get_response_cache(namespace):
+    """Return the process-wide ResponseCache for ``namespace``."""
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = ResponseCache(get_backend(), namespace)
+        return _caches[namespace]
+
+
+def cache_stats():
+    return [cache.stats() for cache in _caches.values()]
@@ -0,0 +1,160 @@
+"""
+Process-wide pool of LLM clients.
+
+``get_client(model_name)`` lazily builds one client per model the first time a
+worker process asks for it and then hands out the same object, so
+``genai.configure`` and the gRPC channel behind it are set up once per process
+rather than once per request. The registry is cleared in forked children
+(gunicorn preloading) because gRPC channels must not be shared across a fork.
+
+Backends (``LLM_CLIENT['BACKEND']``):
+
+* ``gemini`` - Google Gemini through google-generativeai
+* ``stub``   - deterministic offline responses with configurable latency, for
+  load-testing the content and codehelper paths without a network
+"""
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULTS = {
+    'BACKEND': 'gemini',
+    'TIMEOUT': 60,
+    'MAX_CONCURRENCY': 8,
+    'STUB_LATENCY': 0.5,
+    'STUB_CHUNKS': 10,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LLM_CLIENT', {}))
+    return config
+
+
+class BaseClient:
+    """Shared timeout and concurrency limit handling."""
+
+    def __init__(self, model_name, config):
+        self.model_name = model_name
+        self.timeout = config['TIMEOUT']
+        self._slots = threading.BoundedSemaphore(config['MAX_CONCURRENCY'])
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f'No free {self.model_name} slot within {self.timeout}s')
+
+    def generate(self, prompt):
+        self._acquire()
+        try:
+            return self._generate(prompt)
+        finally:
+            self._slots.release()
+
+    def stream(self, prompt):
+        """Yield the response text in chunks as the model produces them."""
+        self._acquire()
+        try:
+            yield from self._stream(prompt)
+        finally:
+            self._slots.release()
+
+
+class GeminiClient(BaseClient):
+    def __init__(self, model_name, config):
+        super().__init__(model_name, config)
+        import google.generativeai as genai
+
+        self.model = genai.GenerativeModel(model_name)
+
+    def _generate(self, prompt):
+        return self.model.generate_content(prompt, timeout=self.timeout).text
+
+    def _stream(self, prompt):
+        response = self.model.generate_content(prompt, stream=True, timeout=self.timeout)
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class StubClient(BaseClient):
+    """Returns the same markdown text for the same prompt, after a fixed delay."""
+
+    WORDS = (
+        'code', 'data', 'model', 'cache', 'query', 'token', 'stream', 'worker',
+        'request', 'latency', 'index', 'build', 'review', 'deploy', 'scale', 'test',
+    )
+
+    def __init__(self, model_name, config):
+        super().__init__(model_name, config)
+        self.latency = config['STUB_LATENCY']
+        self.chunks = max(1, config['STUB_CHUNKS'])
+
+    def render(self, prompt):
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        words = [self.WORDS[b % len(self.WORDS)] for b in digest]
+        paragraphs = [' '.join(words[i:i + 8]).capitalize() + '.' for i in range(0, len(words), 8)]
+        return f"# Stub response {digest.hex()[:8]}\n\n" + '\n\n'.join(paragraphs)
+
+    def _generate(self, prompt):
+        time.sleep(self.latency)
+        return self.render(prompt)
+
+    def _stream(self, prompt):
+        text = self.render(prompt)
+        size = -(-len(text) // self.chunks)
+        for i in range(0, len(text), size):
+            time.sleep(self.latency / self.chunks)
+            yield text[i:i + size]
+
+
+BACKENDS = {
+    'gemini': GeminiClient,
+    'stub': StubClient,
+}
+
+
+class ClientRegistry:
+    """One client per model name per process."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._configured = False
+        self._pid = os.getpid()
+
+    def _configure(self, backend):
+        if backend == 'gemini' and not self._configured:
+            import google.generativeai as genai
+
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._configured = True
+
+    def get(self, model_name):
+        if self._pid != os.getpid():
+            self.reset()
+        client = self._clients.get(model_name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(model_name)
+                if client is None:
+                    config = get_config()
+                    self._configure(config['BACKEND'])
+                    client = BACKENDS[config['BACKEND']](model_name, config)
+                    self._clients[model_name] = client
+        return client
+
+
+registry = ClientRegistry()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.reset)
+
+
+def get_client(model_name):
+    return registry.get(model_name)
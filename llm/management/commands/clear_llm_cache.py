@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from llm.cache import get_backend, get_config
+
+
+class Command(BaseCommand):
+    help = 'Remove entries from the LLM response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expired-only', action='store_true',
+                            help='Only remove entries whose TTL has passed')
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        removed = backend.clear(expired_only=options['expired_only'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {removed} entries from the {get_config()["BACKEND"]} cache ({len(backend)} left)'
+        ))
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class CachedResponse(models.Model):
+    """A model response stored by the database cache backend"""
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.TextField()
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    last_accessed = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Cached Response'
+        verbose_name_plural = 'Cached Responses'
+
+    def __str__(self):
+        return f"{self.key[:12]}... ({self.hits} hits)"
@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import StripeEvent
 
-# Register your models here.
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'type', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'type']
+    search_fields = ['event_id', 'object_id']
+    readonly_fields = ['event_id', 'type', 'object_id', 'payload', 'received_at', 'processed_at']
+    actions = ['retry']
+    
+    @admin.action(description='Retry selected events')
+    def retry(self, request, queryset):
+        updated = queryset.filter(status='failed').update(status='pending', attempts=0, error='')
+        self.message_user(request, f'{updated} events queued again')
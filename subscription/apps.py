@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SubscriptionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subscription'
+
+    def ready(self):
+        from core import pagecache
+
+        from . import refdata  # noqa: F401  connects the invalidation signals
+
+        pagecache.watch('pricing', self.get_model('Plan'))
@@ -0,0 +1,35 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from subscription import webhooks
+
+
+class Command(BaseCommand):
+    help = 'Apply stored Stripe webhook events (token credits, subscription updates) in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Events per transaction (default: STRIPE_WEBHOOKS["BATCH_SIZE"])')
+        parser.add_argument('--once', action='store_true',
+                            help='Process every pending event and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            counts = webhooks.process_pending(options['batch_size'])
+            summary = ', '.join(f'{n} {outcome}' for outcome, n in sorted(counts.items())) or 'nothing to do'
+            self.stdout.write(self.style.SUCCESS(f'Stripe events: {summary}'))
+            return
+
+        stop_event = threading.Event()
+
+        def shutdown(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write('Processing Stripe events...')
+        webhooks.run(stop_event, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Stopped'))
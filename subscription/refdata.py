@@ -0,0 +1,5 @@
+from core.refdata import ReferenceData
+
+from .models import Plan
+
+plans = ReferenceData('plans', lambda: Plan.objects.all(), [Plan])
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import itertools
+import json
+import time
 
-# Create your tests here.
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import TokenTransaction, User
+from .models import Plan, StripeEvent, Subscription
+from . import webhooks
+
+SECRET = 'whsec_test'
+
+
+class FakeStripe:
+    """Builds and signs events the way Stripe does, without the network"""
+    ids = itertools.count(1)
+
+    def __init__(self, secret=SECRET):
+        self.secret = secret
+
+    def event(self, type, obj, event_id=None):
+        return {
+            'id': event_id or f'evt_{next(self.ids)}',
+            'object': 'event',
+            'type': type,
+            'created': int(time.time()),
+            'data': {'object': obj},
+        }
+
+    def checkout_completed(self, user, tokens, plan=None, session_id=None, payment_status='paid', **kwargs):
+        metadata = {'user_id': str(user.pk), 'tokens': str(tokens)}
+        if plan is not None:
+            metadata['plan_id'] = str(plan.pk)
+        session = {
+            'id': session_id or f'cs_{next(self.ids)}',
+            'object': 'checkout.session',
+            'mode': 'payment',
+            'payment_status': payment_status,
+            'subscription': None,
+            'metadata': metadata,
+        }
+        return self.event(kwargs.get('type', 'checkout.session.completed'), session)
+
+    def subscription(self, type, subscription_id, status='active', period_end=None):
+        return self.event(type, {
+            'id': subscription_id,
+            'object': 'subscription',
+            'status': status,
+            'current_period_end': period_end or int(time.time()) + 30 * 86400,
+        })
+
+    def sign(self, payload, timestamp=None):
+        timestamp = timestamp or int(time.time())
+        signature = hmac.new(
+            self.secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256
+        ).hexdigest()
+        return f't={timestamp},v1={signature}'
+
+    def deliver(self, client, event, signature=None):
+        payload = json.dumps(event)
+        return client.post(
+            reverse('stripe_webhook'), payload, content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=signature or self.sign(payload),
+        )
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=SECRET)
+class StripeWebhookTests(TestCase):
+    def setUp(self):
+        self.stripe = FakeStripe()
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'pw', token_balance=0)
+        self.plan = Plan.objects.create(name='pro', price=10, tokens=5000, features='All')
+
+    def balance(self):
+        return User.objects.values_list('token_balance', flat=True).get(pk=self.user.pk)
+
+    def test_signed_event_is_stored_and_acknowledged(self):
+        event = self.stripe.checkout_completed(self.user, 100)
+        response = self.stripe.deliver(self.client, event)
+        self.assertEqual(response.status_code, 200)
+        stored = StripeEvent.objects.get()
+        self.assertEqual((stored.event_id, stored.status), (event['id'], 'pending'))
+        self.assertEqual(self.balance(), 0)  # applied later, not in the request
+
+    def test_bad_signature_is_rejected(self):
+        event = self.stripe.checkout_completed(self.user, 100)
+        forged = FakeStripe('whsec_other').sign(json.dumps(event))
+        self.assertEqual(self.stripe.deliver(self.client, event, forged).status_code, 400)
+        stale = self.stripe.sign(json.dumps(event), timestamp=int(time.time()) - 3600)
+        self.assertEqual(self.stripe.deliver(self.client, event, stale).status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_redelivery_is_stored_once(self):
+        event = self.stripe.checkout_completed(self.user, 100)
+        self.stripe.deliver(self.client, event)
+        self.assertEqual(self.stripe.deliver(self.client, event).status_code, 200)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+
+    def test_checkout_credits_tokens_once(self):
+        self.stripe.deliver(self.client, self.stripe.checkout_completed(self.user, 100))
+        self.assertEqual(webhooks.process_pending(), {'processed': 1})
+        self.assertEqual(webhooks.process_pending(), {})
+        self.assertEqual(self.balance(), 100)
+        self.assertEqual(TokenTransaction.objects.get(user=self.user).service_type, 'purchase')
+        self.assertEqual(StripeEvent.objects.get().status, 'processed')
+
+    def test_session_completed_and_async_success_credit_once(self):
+        self.stripe.deliver(self.client, self.stripe.checkout_completed(
+            self.user, 100, session_id='cs_async', payment_status='unpaid'))
+        self.stripe.deliver(self.client, self.stripe.checkout_completed(
+            self.user, 100, session_id='cs_async', type='checkout.session.async_payment_succeeded'))
+        self.stripe.deliver(self.client, self.stripe.checkout_completed(
+            self.user, 100, session_id='cs_async', type='checkout.session.async_payment_succeeded'))
+        self.assertEqual(webhooks.process_pending(), {'ignored': 2, 'processed': 1})
+        self.assertEqual(self.balance(), 100)
+
+    def test_plan_purchase_records_subscription(self):
+        event = self.stripe.checkout_completed(self.user, self.plan.tokens, plan=self.plan)
+        self.stripe.deliver(self.client, event)
+        webhooks.process_pending()
+        subscription = Subscription.objects.get(user=self.user)
+        self.assertEqual((subscription.plan, subscription.status), (self.plan, 'active'))
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.subscription_plan, self.user.token_balance), ('pro', 5000))
+
+    def test_subscription_updates_and_cancellation(self):
+        Subscription.objects.create(user=self.user, plan=self.plan, stripe_subscription_id='sub_1')
+        User.objects.filter(pk=self.user.pk).update(subscription_plan='pro')
+        self.stripe.deliver(self.client, self.stripe.subscription(
+            'customer.subscription.updated', 'sub_1', status='past_due'))
+        self.stripe.deliver(self.client, self.stripe.subscription(
+            'customer.subscription.deleted', 'sub_1', status='canceled'))
+        self.stripe.deliver(self.client, self.stripe.subscription(
+            'customer.subscription.deleted', 'sub_unknown'))
+        self.assertEqual(webhooks.process_pending(), {'processed': 2, 'ignored': 1})
+        self.assertEqual(Subscription.objects.get().status, 'canceled')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.subscription_plan, 'free')
+
+    @override_settings(STRIPE_WEBHOOKS={'MAX_ATTEMPTS': 2})
+    def test_failing_event_does_not_block_the_batch(self):
+        ghost = User(pk=999999)
+        self.stripe.deliver(self.client, self.stripe.checkout_completed(ghost, 100))
+        self.stripe.deliver(self.client, self.stripe.checkout_completed(self.user, 100))
+        self.assertEqual(webhooks.process_batch(), {'failed': 1, 'processed': 1})
+        self.assertEqual(self.balance(), 100)
+        self.assertEqual(webhooks.process_batch(), {'failed': 1})
+        failed = StripeEvent.objects.get(status='failed')
+        self.assertEqual(failed.attempts, 2)
+        self.assertIn('Unknown user', failed.error)
+        self.assertEqual(webhooks.process_batch(), {})
+
+    def test_batches_apply_many_events(self):
+        for _ in range(25):
+            self.stripe.deliver(self.client, self.stripe.checkout_completed(self.user, 10))
+        events = list(StripeEvent.objects.all())
+        with self.assertNumQueries(2):  # users, already credited sessions
+            webhooks.Batch(events)
+        self.assertEqual(webhooks.process_batch(batch_size=25), {'processed': 25})
+        self.assertEqual(self.balance(), 250)
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=SECRET, STRIPE_WEBHOOKS={'EAGER': True})
+class EagerStripeWebhookTests(TransactionTestCase):
+    def test_event_applied_after_response(self):
+        user = User.objects.create_user('buyer', 'buyer@example.com', 'pw', token_balance=0)
+        FakeStripe().deliver(self.client, FakeStripe().checkout_completed(user, 100))
+        user.refresh_from_db()
+        self.assertEqual(user.token_balance, 100)
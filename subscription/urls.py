@@ -10,4 +10,5 @@ urlpatterns = [
     path('success/', views.payment_success, name='payment_success'),
     path('cancel/', views.payment_cancel, name='payment_cancel'),
     path('tokens-added/', views.tokens_added, name='tokens_added'),
+    path('webhook/', views.stripe_webhook, name='stripe_webhook'),
 ]
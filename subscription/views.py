@@ -7,14 +7,24 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from core import pagecache
 from .models import Plan
+from .refdata import plans as plan_list
+from .webhooks import InvalidEvent, receive
 import stripe
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+@pagecache.cache_anonymous_page('pricing')
 def pricing(request):
-    plans = Plan.objects.all()
-    return render(request, 'subscription/pricing.html', {'plans': plans})
+    plans = plan_list.all()
+    return render(request, 'subscription/pricing.html', {
+        'plans': plans,
+        'page_version': pagecache.version('pricing'),
+    })
 
 @login_required
 def create_checkout_session(request, plan_id):
@@ -99,3 +109,13 @@ def buy_tokens(request):
 def tokens_added(request):
     messages.success(request, '✨ Tokens added successfully!')
     return redirect('dashboard')
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """Store a signed Stripe event; subscription/webhooks.py applies it later"""
+    try:
+        receive(request.body, request.headers.get('Stripe-Signature', ''))
+    except InvalidEvent as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'received': True})
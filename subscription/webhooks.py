@@ -0,0 +1,292 @@
+"""
+Stripe webhooks.
+
+The endpoint does as little as possible: it checks the ``Stripe-Signature``
+header, stores the raw body as a ``pending`` StripeEvent and answers 200.
+``event_id`` is unique, so a redelivered event is dropped by the insert
+itself (``INSERT ... ON CONFLICT DO NOTHING``).
+
+``python manage.py process_stripe_events`` applies pending events in batches.
+Each batch is one transaction with the users, plans and subscriptions it
+needs loaded up front; each event runs in its own savepoint that first flips
+it from ``pending`` to ``processed``, so an event's effects and its status
+commit together and a second processor can never apply it again. A failing
+event is rolled back on its own and retried up to ``MAX_ATTEMPTS`` times.
+
+Handled events:
+
+* ``checkout.session.completed`` / ``checkout.session.async_payment_succeeded``
+  - credit ``metadata.tokens`` to ``metadata.user_id`` (once per session, even
+  when Stripe sends both), and for plan purchases record the Subscription and
+  the user's ``subscription_plan``.
+* ``customer.subscription.updated`` / ``customer.subscription.deleted`` - sync
+  the Subscription status and end date; a user left without an active
+  subscription goes back to the free plan.
+* ``invoice.paid`` for a subscription renewal - credit the plan's tokens.
+
+Everything else is stored and marked ``ignored``.
+"""
+import json
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+import stripe
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.ledger import credit
+from accounts.models import User
+
+from .models import Plan, StripeEvent, Subscription
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'TOLERANCE': 300,
+    'BATCH_SIZE': 100,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 5,
+    'EAGER': False,
+}
+
+CHECKOUT_EVENTS = ('checkout.session.completed', 'checkout.session.async_payment_succeeded')
+
+
+class InvalidEvent(Exception):
+    pass
+
+
+class IgnoreEvent(Exception):
+    pass
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'STRIPE_WEBHOOKS', {}))
+    return config
+
+
+# ============================================
+# RECEIVING
+# ============================================
+
+def receive(payload, signature):
+    """Verify and store one delivery; raises InvalidEvent if it is not from Stripe."""
+    secret = getattr(settings, 'STRIPE_WEBHOOK_SECRET', None)
+    if not secret:
+        raise InvalidEvent('Webhook secret is not configured')
+    try:
+        payload = payload.decode('utf-8') if isinstance(payload, bytes) else payload
+        stripe.WebhookSignature.verify_header(
+            payload, signature, secret, get_config()['TOLERANCE']
+        )
+        data = json.loads(payload)
+        event = StripeEvent(
+            event_id=data['id'],
+            type=data['type'],
+            object_id=data['data']['object'].get('id') or '',
+            payload=payload,
+        )
+    except stripe.error.SignatureVerificationError:
+        raise InvalidEvent('Invalid signature')
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise InvalidEvent('Malformed event')
+
+    # A redelivery hits the unique event_id and is skipped by the insert
+    StripeEvent.objects.bulk_create([event], ignore_conflicts=True)
+    if get_config()['EAGER']:
+        transaction.on_commit(process_pending)
+
+
+# ============================================
+# PROCESSING
+# ============================================
+
+def _timestamp(value):
+    if not value:
+        return None
+    return datetime.fromtimestamp(int(value), tz=dt_timezone.utc)
+
+
+class Batch:
+    """The rows a batch of events touches, loaded with one query per model."""
+
+    def __init__(self, events):
+        self.events = events
+        self.objects = {event.pk: json.loads(event.payload)['data']['object'] for event in events}
+
+        user_ids, plan_ids, subscription_ids = set(), set(), set()
+        for obj in self.objects.values():
+            metadata = obj.get('metadata') or {}
+            if str(metadata.get('user_id', '')).isdigit():
+                user_ids.add(int(metadata['user_id']))
+            if str(metadata.get('plan_id', '')).isdigit():
+                plan_ids.add(int(metadata['plan_id']))
+            subscription_id = obj.get('subscription') if obj.get('object') != 'subscription' else obj.get('id')
+            if subscription_id:
+                subscription_ids.add(subscription_id)
+
+        self.subscriptions = {
+            sub.stripe_subscription_id: sub
+            for sub in Subscription.objects.select_related('plan').filter(
+                stripe_subscription_id__in=subscription_ids
+            )
+        }
+        user_ids.update(sub.user_id for sub in self.subscriptions.values())
+        self.users = User.objects.in_bulk(user_ids)
+        self.plans = Plan.objects.in_bulk(plan_ids)
+
+        # Checkout sessions credited by an earlier event
+        session_ids = [event.object_id for event in events if event.type in CHECKOUT_EVENTS]
+        self.credited_sessions = set(
+            StripeEvent.objects.filter(
+                object_id__in=session_ids, type__in=CHECKOUT_EVENTS, status='processed'
+            ).order_by().values_list('object_id', flat=True)
+        )
+
+    def user(self, metadata):
+        user = self.users.get(int(metadata.get('user_id') or 0))
+        if user is None:
+            raise ValueError(f"Unknown user {metadata.get('user_id')!r}")
+        return user
+
+
+def handle_checkout(batch, event, session):
+    if session.get('payment_status') not in ('paid', 'no_payment_required'):
+        raise IgnoreEvent('Payment not completed yet')
+    if event.object_id in batch.credited_sessions:
+        raise IgnoreEvent('Session already credited')
+
+    metadata = session.get('metadata') or {}
+    user = batch.user(metadata)
+    tokens = int(metadata.get('tokens') or 0)
+    if tokens > 0:
+        credit(user, tokens, 'purchase')
+
+    plan = batch.plans.get(int(metadata.get('plan_id') or 0))
+    if plan is not None:
+        subscription_id = session.get('subscription') or session['id']
+        subscription = batch.subscriptions.get(subscription_id)
+        if subscription is None:
+            subscription = Subscription.objects.create(
+                user=user, plan=plan, stripe_subscription_id=subscription_id
+            )
+            batch.subscriptions[subscription_id] = subscription
+        else:
+            Subscription.objects.filter(pk=subscription.pk).update(plan=plan, status='active')
+        User.objects.filter(pk=user.pk).update(subscription_plan=plan.name)
+        user.subscription_plan = plan.name
+    batch.credited_sessions.add(event.object_id)
+
+
+def handle_subscription(batch, event, obj):
+    subscription = batch.subscriptions.get(obj['id'])
+    if subscription is None:
+        raise IgnoreEvent('Unknown subscription')
+
+    status = 'canceled' if event.type == 'customer.subscription.deleted' else obj.get('status', 'active')
+    end_date = _timestamp(obj.get('ended_at') or obj.get('current_period_end'))
+    Subscription.objects.filter(pk=subscription.pk).update(status=status, end_date=end_date)
+    subscription.status, subscription.end_date = status, end_date
+
+    if status == 'active':
+        User.objects.filter(pk=subscription.user_id).update(
+            subscription_plan=subscription.plan.name if subscription.plan else F('subscription_plan'),
+            subscription_end=end_date,
+        )
+    elif not Subscription.objects.filter(user_id=subscription.user_id, status='active').exists():
+        User.objects.filter(pk=subscription.user_id).update(subscription_plan='free', subscription_end=end_date)
+
+
+def handle_invoice(batch, event, invoice):
+    if invoice.get('billing_reason') != 'subscription_cycle':
+        raise IgnoreEvent('Not a renewal')
+    subscription = batch.subscriptions.get(invoice.get('subscription'))
+    if subscription is None or subscription.plan is None:
+        raise IgnoreEvent('Unknown subscription')
+    credit(batch.users[subscription.user_id], subscription.plan.tokens, 'purchase')
+
+
+HANDLERS = {
+    'checkout.session.completed': handle_checkout,
+    'checkout.session.async_payment_succeeded': handle_checkout,
+    'customer.subscription.updated': handle_subscription,
+    'customer.subscription.deleted': handle_subscription,
+    'invoice.paid': handle_invoice,
+}
+
+
+def apply_event(batch, event):
+    """Claim and apply one event inside the batch transaction."""
+    handler = HANDLERS.get(event.type)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # Claim first: the row lock is held until the batch commits
+            claimed = StripeEvent.objects.filter(pk=event.pk, status='pending').update(
+                status='processed', processed_at=now, attempts=F('attempts') + 1
+            )
+            if not claimed:
+                return None
+            if handler is None:
+                raise IgnoreEvent('Unhandled event type')
+            handler(batch, event, batch.objects[event.pk])
+        return 'processed'
+    except IgnoreEvent as e:
+        StripeEvent.objects.filter(pk=event.pk).update(
+            status='ignored', processed_at=now, attempts=F('attempts') + 1, error=str(e)
+        )
+        return 'ignored'
+    except Exception as e:
+        logger.exception('Stripe event %s failed', event.event_id)
+        failed = event.attempts + 1 >= get_config()['MAX_ATTEMPTS']
+        StripeEvent.objects.filter(pk=event.pk).update(
+            status='failed' if failed else 'pending', attempts=F('attempts') + 1, error=str(e)
+        )
+        return 'failed'
+
+
+def process_batch(batch_size=None):
+    """Apply up to ``batch_size`` pending events. Returns ``{outcome: count}``."""
+    batch_size = batch_size or get_config()['BATCH_SIZE']
+    events = list(
+        StripeEvent.objects.filter(status='pending').order_by('received_at', 'pk')
+        .only('pk', 'event_id', 'type', 'object_id', 'payload', 'attempts')[:batch_size]
+    )
+    counts = {}
+    if not events:
+        return counts
+    with transaction.atomic():
+        batch = Batch(events)
+        for event in events:
+            outcome = apply_event(batch, event)
+            if outcome:
+                counts[outcome] = counts.get(outcome, 0) + 1
+    return counts
+
+
+def process_pending(batch_size=None):
+    """Apply batches until no pending event is left. Returns ``{outcome: count}``."""
+    totals = {}
+    while True:
+        counts = process_batch(batch_size)
+        if not counts:
+            return totals
+        for outcome, n in counts.items():
+            totals[outcome] = totals.get(outcome, 0) + n
+        if set(counts) == {'failed'}:
+            return totals  # only retries left; leave them for the next run
+
+
+def run(stop_event, batch_size=None):
+    """Poll for pending events until ``stop_event`` is set."""
+    interval = get_config()['POLL_INTERVAL']
+    while not stop_event.is_set():
+        try:
+            if not process_batch(batch_size):
+                stop_event.wait(interval)
+        except Exception:
+            logger.exception('Stripe event processor error')
+            stop_event.wait(interval)